@@ -1,41 +1,37 @@
 from abc import ABC, abstractmethod
-from langchain_openai import ChatOpenAI
 from langsmith import traceable
 import logging
 from datetime import datetime
 import os
-import base64
-import requests
-from io import BytesIO
-from PIL import Image
-import imagehash
+import asyncio
 from typing import Dict, Optional
-from supabase import create_client, Client
+from ..utils.artifact_store import artifact_store
+from ..utils.clients import get_async_openai, get_chat_llm, get_supabase
 
 logger = logging.getLogger(__name__)
 
 class BaseAgent(ABC):
     def __init__(self, name: str, model_provider: str = "openai"):
         self.name = name
-        # Initialize OpenAI with Vision capabilities
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini", 
-            api_key=os.getenv("OPENAI_API_KEY"),
-            temperature=0.1
-        )
-        
-        # Initialize Supabase for Historical Checks
-        url: str = os.getenv("SUPABASE_URL")
-        key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        if url and key:
-            self.supabase: Client = create_client(url, key)
-        else:
-            self.supabase = None
-            logger.warning(f"{name}: Supabase credentials missing")
+        # OpenAI (with Vision capabilities) and Supabase (for historical checks)
+        # clients come from the shared registry and are created on first use
+
+        # Images are downscaled and re-encoded before being sent to the vision API
+        self.vision_max_edge = int(os.getenv("VISION_MAX_EDGE", "1536"))
+        self.vision_image_format = os.getenv("VISION_IMAGE_FORMAT", "JPEG")
+        self.vision_image_quality = int(os.getenv("VISION_IMAGE_QUALITY", "85"))
 
         self.system_prompt = f"You are a {name} agent for insurance claim processing."
         logger.info(f"{name} agent initialized with {model_provider}")
 
+    @property
+    def llm(self):
+        return get_chat_llm()
+
+    @property
+    def supabase(self):
+        return get_supabase()
+
     @traceable
     async def health_check(self):
         return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
@@ -49,66 +45,71 @@ class BaseAgent(ABC):
         }
 
     # ==================== VISION UTILITIES ====================
-    def _encode_image_from_url(self, image_url: str) -> Optional[str]:
-        """Download and base64 encode image from URL"""
-        try:
-            response = requests.get(image_url, timeout=15)
-            response.raise_for_status()
-            return base64.b64encode(response.content).decode('utf-8')
-        except Exception as e:
-            logger.error(f"Failed to download/encode image: {e}")
-            return None
-
-    def _get_image_hash(self, image_url: str) -> Optional[str]:
+    # All helpers share one download per URL through the process-wide artifact store.
+    # Decoding/hashing is CPU work, so it runs off the event loop.
+    async def _get_image_hash(self, image_url: str) -> Optional[str]:
         """Generate perceptual hash for duplicate detection"""
         try:
-            response = requests.get(image_url, timeout=10)
-            img = Image.open(BytesIO(response.content))
-            return str(imagehash.phash(img))
+            artifact = await artifact_store.get(image_url)
+            return await asyncio.to_thread(lambda: artifact.phash)
         except Exception as e:
             logger.error(f"Failed to hash image: {e}")
             return None
 
-    def _extract_image_metadata(self, image_url: str) -> dict:
+    async def _extract_image_metadata(self, image_url: str) -> dict:
         """Extract EXIF and basic metadata from image"""
         metadata = {"has_exif": False, "dimensions": None}
         try:
-            response = requests.get(image_url, timeout=10)
-            img = Image.open(BytesIO(response.content))
-            
-            # Get dimensions
-            metadata["dimensions"] = img.size
-            
-            # Check for EXIF data
-            exif_data = img._getexif() if hasattr(img, '_getexif') else None
-            if exif_data:
-                metadata["has_exif"] = True
-            
+            artifact = await artifact_store.get(image_url)
+            metadata.update(await asyncio.to_thread(lambda: artifact.metadata))
         except Exception as e:
             logger.error(f"Failed to extract metadata: {e}")
         
         return metadata
 
-    async def _analyze_image_with_vision(self, image_url: str, prompt: str) -> Optional[str]:
+    async def _prepare_vision_image(self, image_url: str) -> Optional[dict]:
+        """Downscale/re-encode an image for the vision API ({mime_type, base64, bytes_saved})"""
+        try:
+            artifact = await artifact_store.get(image_url)
+            return await asyncio.to_thread(
+                artifact.vision_payload,
+                self.vision_max_edge, self.vision_image_format, self.vision_image_quality
+            )
+        except Exception as e:
+            logger.error(f"Failed to prepare image for vision: {e}")
+            return None
+
+    async def _analyze_image_with_vision(self, image_url: str, prompt: str, prepared: Optional[list] = None) -> Optional[str]:
         """Call OpenAI Vision API for image analysis"""
+        return await self._analyze_images_with_vision([image_url], prompt, prepared=prepared)
+
+    async def _analyze_images_with_vision(self, image_urls: list, prompt: str, max_tokens: int = 500,
+                                          prepared: Optional[list] = None) -> Optional[str]:
+        """Call OpenAI Vision API with one or more images in a single request.
+
+        The prepared image payloads are appended to `prepared` when given.
+        """
         try:
-            base64_image = self._encode_image_from_url(image_url)
-            if not base64_image: 
+            images = await asyncio.gather(*(self._prepare_vision_image(url) for url in image_urls))
+            if prepared is not None:
+                prepared.extend(image for image in images if image)
+            if not all(images): 
                 return None
 
-            from openai import OpenAI
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            client = get_async_openai()
             
-            response = client.chat.completions.create(
+            content = [{"type": "text", "text": prompt}]
+            content += [
+                {"type": "image_url", "image_url": {"url": f"data:{image['mime_type']};base64,{image['base64']}"}}
+                for image in images
+            ]
+            response = await client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": [
-                        {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
-                    ]}
+                    {"role": "user", "content": content}
                 ],
-                max_tokens=500
+                max_tokens=max_tokens
             )
             return response.choices[0].message.content
         except Exception as e:
@@ -1,14 +1,25 @@
 from .base_agent import BaseAgent
+from ..utils.phash_index import phash_index
 from datetime import datetime
+from typing import Optional
+import asyncio
 import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+SEVERITY_ORDER = ["none", "minor", "moderate", "severe", "total_loss"]
+
 class DamageAgent(BaseAgent):
     def __init__(self):
         super().__init__("damage_agent")
         self.system_prompt += " Assess damage from photos using AI vision analysis."
+        self.max_concurrent_photos = int(os.getenv("DAMAGE_PHOTO_CONCURRENCY", "4"))
+        # >1 sends several photos in one vision request to save round-trips
+        self.photos_per_request = int(os.getenv("DAMAGE_PHOTOS_PER_REQUEST", "1"))
+        # Max phash Hamming distance for two photos to count as the same picture
+        self.duplicate_photo_radius = int(os.getenv("DUPLICATE_PHOTO_RADIUS", "6"))
 
     async def process(self, claim_data: dict) -> dict:
         start_time = datetime.utcnow()
@@ -32,95 +43,96 @@ class DamageAgent(BaseAgent):
             findings["estimated_cost"] = req_amount * 0.7
             return self._create_agent_report(0.2, findings, (datetime.utcnow() - start_time).total_seconds())
 
-        # Analyze first photo (in production, loop through all photos)
-        main_photo = photo_urls[0]
-        
-        # 1. Check Image Metadata & Hash (Relaxed)
-        metadata = self._extract_image_metadata(main_photo)
-        if not metadata.get("has_exif"):
+        # 1. Check Image Metadata & Hash (Relaxed) for every photo
+        metadata_list = await asyncio.gather(*(self._extract_image_metadata(url) for url in photo_urls))
+        if not all(metadata.get("has_exif") for metadata in metadata_list):
             # ✅ FIX: Missing EXIF is common for web uploads, social media images
             # Don't auto-flag as fraud, just note it
             logger.info("Photo lacks EXIF data - typical for digital/web images")
             findings["metadata_note"] = "Digital image (no EXIF) - common for web uploads"
         
-        img_hash = self._get_image_hash(main_photo)
-        if img_hash:
-            # In production, check against database of known fraud images
-            findings["image_hash"] = img_hash
+        img_hashes = await asyncio.gather(*(self._get_image_hash(url) for url in photo_urls))
+        if img_hashes[0]:
+            findings["image_hash"] = img_hashes[0]
+        findings["image_hashes"] = [h for h in img_hashes if h]
+        
+        # Cross-claim duplicate photo check against every photo seen before
+        claim_id = claim_data.get("claim_id", "")
+        # SQLite reads/writes run off the event loop, in one thread hop and one transaction per claim
+        duplicate_matches = await asyncio.to_thread(self._find_duplicate_photos, claim_id, photo_urls, img_hashes)
+        findings["duplicate_photo_matches"] = duplicate_matches
+        if duplicate_matches:
+            # One flag however many photos match; the per-photo detail is in duplicate_photo_matches
+            closest = min((d["matches"][0] for d in duplicate_matches), key=lambda m: m["distance"])
+            findings["red_flags"].append(
+                f"Duplicate photo: {len(duplicate_matches)} of {len(photo_urls)} photo(s) match photos from other claims "
+                f"(closest: claim {closest['claim_id']}, hash distance {closest['distance']})"
+            )
 
-        # 2. AI Vision Analysis (Context-Aware)
+        # 2. AI Vision Analysis (Context-Aware), all photos concurrently
         user_description = claim_data.get("description", "")
-        vision_prompt = f"""
-        Analyze this image for a {claim_type.upper()} insurance claim.
+        prepared = []
+        assessments = await self._assess_photos(photo_urls, claim_type, user_description, prepared)
+        findings["photos_analyzed"] = len(photo_urls)
+        findings["photo_assessments"] = [
+            {"url": url, **assessment} if assessment else {"url": url, "error": "analysis unavailable"}
+            for url, assessment in zip(photo_urls, assessments)
+        ]
+        valid_assessments = [a for a in assessments if a]
         
-        User Description: "{user_description}"
-        
-        Task:
-        1. Verify if the image shows damage consistent with the description.
-        2. Estimate repair cost considering materials mentioned (e.g., 'tempered glass', 'marble', 'electronics' cost more).
+        findings["vision_bytes_saved"] = sum(p["bytes_saved"] for p in prepared)
         
-        Return ONLY valid JSON with these exact fields:
-        {{
-            "valid_evidence": true/false (is this actually showing {claim_type} damage matching the description?),
-            "severity": "none/minor/moderate/severe/total_loss",
-            "description": "brief description of what you see",
-            "estimate_min": number (minimum USD repair cost estimate),
-            "estimate_max": number (maximum USD repair cost estimate),
-            "confidence": number (0-100, how confident are you in this assessment)
-        }}
-        
-        CRITICAL: If this image does NOT show {claim_type} damage (e.g., wrong type of property), set valid_evidence to false.
-        """
-        
-        vision_response = await self._analyze_image_with_vision(main_photo, vision_prompt)
-        
-        if vision_response:
-            try:
-                # Parse vision AI response
-                clean_response = vision_response.replace("```json", "").replace("```", "").strip()
-                vision_data = json.loads(clean_response)
-                
-                findings["image_analysis_performed"] = True
-                findings["damage_detected"] = vision_data.get("valid_evidence", False)
-                findings["severity"] = vision_data.get("severity", "unknown")
-                findings["damage_description"] = vision_data.get("description", "")
-                
-                # Calculate estimated cost from AI
-                est_min = vision_data.get("estimate_min", 0)
-                est_max = vision_data.get("estimate_max", 0)
-                avg_estimate = (est_min + est_max) / 2 if est_max > 0 else est_min
-                findings["estimated_cost"] = avg_estimate
-                findings["estimate_range"] = f"${est_min:,.0f} - ${est_max:,.0f}"
-                
-                # CASE B: Photo Type Mismatch
-                if not findings["damage_detected"]:
-                    # Provide helpful guidance about what was actually detected
-                    detected_content = findings['damage_description'].lower()
-                    suggested_type = self._suggest_claim_type(detected_content)
-                    
-                    findings["red_flags"].append(
-                        f"Photo type mismatch: Image shows {findings['damage_description']}, not {claim_type} damage. {suggested_type}"
-                    )
-                
-                # Price Inflation Check (ONLY flag if claimed > 2.5x estimate)
-                # Do NOT flag if claimed < estimate (that's honest/conservative)
-                if avg_estimate > 0 and req_amount > (avg_estimate * 2.5):
-                    findings["red_flags"].append(
-                        f"Requested amount ${req_amount:,.0f} is {req_amount/avg_estimate:.1f}x higher than AI estimate ${avg_estimate:,.0f}"
-                    )
-                    logger.warning(f"⚠️ Price inflation: ${req_amount} >> ${avg_estimate} AI estimate")
-                elif avg_estimate > 0 and req_amount < avg_estimate:
-                    # User claiming LESS than AI estimate - this is good (conservative claim)
-                    logger.info(f"✅ Conservative claim: ${req_amount} < ${avg_estimate} AI estimate - legitimate")
-                
-                # Store AI confidence
-                findings["ai_confidence"] = vision_data.get("confidence", 50)
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Vision API response: {e}")
-                findings["red_flags"].append("AI vision analysis failed to parse")
-                # Fallback to simple estimate
-                findings["estimated_cost"] = req_amount * 0.7
+        if valid_assessments:
+            findings["image_analysis_performed"] = True
+            evidence = [a for a in valid_assessments if a.get("valid_evidence", False)]
+            findings["damage_detected"] = bool(evidence)
+            
+            # Aggregate: worst severity, union of cost ranges (photos showing damage take priority)
+            considered = evidence or valid_assessments
+            findings["severity"] = max(
+                (a.get("severity", "unknown") for a in considered),
+                key=lambda severity: SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else -1
+            )
+            findings["damage_description"] = " | ".join(a.get("description", "") for a in considered if a.get("description"))
+            
+            # Calculate estimated cost from AI
+            est_min = min(a.get("estimate_min", 0) for a in considered)
+            est_max = max(a.get("estimate_max", 0) for a in considered)
+            avg_estimate = (est_min + est_max) / 2 if est_max > 0 else est_min
+            findings["estimated_cost"] = avg_estimate
+            findings["estimate_range"] = f"${est_min:,.0f} - ${est_max:,.0f}"
+            
+            # CASE B: Photo Type Mismatch (one flag, however many photos)
+            mismatched = [(index, a) for index, a in enumerate(assessments, start=1) if a and not a.get("valid_evidence", False)]
+            if mismatched:
+                findings["mismatched_photos"] = [index for index, _ in mismatched]
+                # Provide helpful guidance about what was actually detected
+                detected = "; ".join(dict.fromkeys(a.get("description", "") for _, a in mismatched))
+                suggested_type = self._suggest_claim_type(detected.lower())
+                if len(photo_urls) == 1:
+                    subject = "Image shows"
+                else:
+                    subject = f"{len(mismatched)} of {len(photo_urls)} photos show"
+                findings["red_flags"].append(
+                    f"Photo type mismatch: {subject} {detected}, not {claim_type} damage. {suggested_type}"
+                )
+            
+            # Price Inflation Check (ONLY flag if claimed > 2.5x estimate)
+            # Do NOT flag if claimed < estimate (that's honest/conservative)
+            if avg_estimate > 0 and req_amount > (avg_estimate * 2.5):
+                findings["red_flags"].append(
+                    f"Requested amount ${req_amount:,.0f} is {req_amount/avg_estimate:.1f}x higher than AI estimate ${avg_estimate:,.0f}"
+                )
+                logger.warning(f"⚠️ Price inflation: ${req_amount} >> ${avg_estimate} AI estimate")
+            elif avg_estimate > 0 and req_amount < avg_estimate:
+                # User claiming LESS than AI estimate - this is good (conservative claim)
+                logger.info(f"✅ Conservative claim: ${req_amount} < ${avg_estimate} AI estimate - legitimate")
+            
+            # Store AI confidence
+            findings["ai_confidence"] = sum(a.get("confidence", 50) for a in valid_assessments) / len(valid_assessments)
+            
+            # Partial vision failure is not evidence of fraud; the count is kept for review
+            findings["photos_unanalyzed"] = len(photo_urls) - len(valid_assessments)
         else:
             # Vision API failed, use fallback logic
             findings["red_flags"].append("AI vision analysis unavailable")
@@ -136,7 +148,111 @@ class DamageAgent(BaseAgent):
         elif findings["red_flags"]:
             confidence = 0.5
         
-        return self._create_agent_report(confidence, findings, processing_time)    
+        return self._create_agent_report(confidence, findings, processing_time)
+
+    def _find_duplicate_photos(self, claim_id: str, photo_urls: list, img_hashes: list) -> list:
+        """Match each photo against photos from other claims, then record them (blocking)"""
+        duplicate_matches = []
+        for index, (url, img_hash) in enumerate(zip(photo_urls, img_hashes), start=1):
+            if not img_hash:
+                continue
+            matches = [m for m in phash_index.query(img_hash, self.duplicate_photo_radius) if m["claim_id"] != claim_id]
+            if matches:
+                duplicate_matches.append({"photo": index, "url": url, "matches": matches[:5]})
+                logger.warning(f"⚠️ Photo {url} near-duplicates a photo from claim {matches[0]['claim_id']}")
+        phash_index.add_many((img_hash, claim_id, url) for url, img_hash in zip(photo_urls, img_hashes) if img_hash)
+        return duplicate_matches
+
+    async def _assess_photos(self, photo_urls: list, claim_type: str, user_description: str,
+                             prepared: Optional[list] = None) -> list:
+        """Run vision analysis on every photo, concurrently and in input order.
+
+        With photos_per_request > 1, photos are grouped so several images share
+        one vision request. Returns one parsed assessment dict (or None) per photo;
+        the image payloads sent are appended to `prepared`.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_photos)
+        size = max(1, self.photos_per_request)
+        batches = [photo_urls[i:i + size] for i in range(0, len(photo_urls), size)]
+
+        async def assess(batch):
+            async with semaphore:
+                if len(batch) == 1:
+                    prompt = self._build_vision_prompt(claim_type, user_description)
+                    response = await self._analyze_image_with_vision(batch[0], prompt, prepared)
+                else:
+                    prompt = self._build_vision_prompt(claim_type, user_description, image_count=len(batch))
+                    response = await self._analyze_images_with_vision(batch, prompt, max_tokens=300 * len(batch),
+                                                                      prepared=prepared)
+            return self._parse_vision_response(response, len(batch))
+
+        results = await asyncio.gather(*(assess(batch) for batch in batches))
+        return [assessment for batch_result in results for assessment in batch_result]
+
+    def _build_vision_prompt(self, claim_type: str, user_description: str, image_count: int = 1) -> str:
+        fields = f"""{{
+            "valid_evidence": true/false (is this actually showing {claim_type} damage matching the description?),
+            "severity": "none/minor/moderate/severe/total_loss",
+            "description": "brief description of what you see",
+            "estimate_min": number (minimum USD repair cost estimate),
+            "estimate_max": number (maximum USD repair cost estimate),
+            "confidence": number (0-100, how confident are you in this assessment)
+        }}"""
+        if image_count == 1:
+            subject = "this image"
+            output = f"Return ONLY valid JSON with these exact fields:\n        {fields}"
+        else:
+            subject = f"each of these {image_count} images separately"
+            output = (
+                f"Return ONLY a valid JSON array with {image_count} objects, one per image in the order given, "
+                f"each with these exact fields:\n        {fields}"
+            )
+        return f"""
+        Analyze {subject} for a {claim_type.upper()} insurance claim.
+        
+        User Description: "{user_description}"
+        
+        Task:
+        1. Verify if the image shows damage consistent with the description.
+        2. Estimate repair cost considering materials mentioned (e.g., 'tempered glass', 'marble', 'electronics' cost more).
+        
+        {output}
+        
+        CRITICAL: If an image does NOT show {claim_type} damage (e.g., wrong type of property), set valid_evidence to false.
+        """
+
+    def _parse_vision_response(self, vision_response: Optional[str], image_count: int) -> list:
+        """Parse vision JSON into one assessment per image (None where unusable)"""
+        if not vision_response:
+            return [None] * image_count
+        try:
+            # Parse vision AI response
+            clean_response = vision_response.replace("```json", "").replace("```", "").strip()
+            vision_data = json.loads(clean_response)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse Vision API response: {e}")
+            return [None] * image_count
+
+        if isinstance(vision_data, dict):
+            vision_data = [vision_data]
+        if not isinstance(vision_data, list):
+            logger.error(f"Vision API returned {type(vision_data).__name__} instead of an assessment object")
+            return [None] * image_count
+        if len(vision_data) != image_count:
+            logger.error(f"Vision API returned {len(vision_data)} assessments for {image_count} images")
+            return [None] * image_count
+        # An item that is not an object (e.g. a bare string) or has non-numeric figures counts as unparseable
+        return [item if self._is_assessment(item) else None for item in vision_data]
+
+    @staticmethod
+    def _is_assessment(item) -> bool:
+        if not isinstance(item, dict):
+            return False
+        return all(
+            isinstance(item[field], (int, float)) and not isinstance(item[field], bool)
+            for field in ("estimate_min", "estimate_max", "confidence") if field in item
+        )
+
     def _suggest_claim_type(self, description: str) -> str:
         """Suggest correct claim type based on detected content"""
         desc_lower = description.lower()
@@ -1,19 +1,43 @@
 from .base_agent import BaseAgent
-import pytesseract
-from PIL import Image
-import requests
-from io import BytesIO
-from pdf2image import convert_from_bytes
+from ..utils.artifact_store import artifact_store
+from ..utils.ocr_engine import ocr_engine
+from ..utils.ocr_cache import ocr_cache, OCRCache
+from ..utils.classification_cache import classification_cache
 from datetime import datetime, timedelta
 import dateparser
 import re
+import os
+import json
+import asyncio
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+DOCUMENT_CATEGORIES = {
+    "AUTO_REPAIR_ESTIMATE": "Car parts, garage, VIN, vehicle registration",
+    "HOME_INCIDENT_REPORT": "HOA, Resident Association, Property damage, Address, Window/Roof/Leak/Breakage",
+    "MEDICAL_BILL": "Hospital, Doctor, Diagnosis, Patient",
+    "POLICE_REPORT": "Police, Officer, Case number",
+    "INVOICE_RECEIPT": "Generic invoice, receipt",
+    "UNKNOWN": "Cannot determine",
+}
+CATEGORY_LIST = "\n".join(f"- {name} ({hint})" for name, hint in DOCUMENT_CATEGORIES.items())
+
+
+def normalize_document_type(label: str) -> Optional[str]:
+    """Map an LLM reply like '"medical bill".' or 'Category: MEDICAL_BILL' to a category, or None"""
+    cleaned = re.sub(r"[^A-Z_ ]", "", label.upper()).strip()
+    candidate = re.sub(r"\s+", "_", cleaned)
+    if candidate in DOCUMENT_CATEGORIES:
+        return candidate
+    found = [name for name in DOCUMENT_CATEGORIES if name in candidate]
+    return found[0] if len(found) == 1 else None
+
 class DocumentAgent(BaseAgent):
     def __init__(self):
         super().__init__("document_agent")
+        self.max_concurrent_documents = int(os.getenv("DOCUMENT_CONCURRENCY", "4"))
         self.system_prompt += " You are an expert insurance document analyst. Accurately classify documents (Home Incident Reports, Police Reports, Medical Bills, Auto Repair Estimates) and validate consistency."
 
     async def process(self, claim_data: dict) -> dict:
@@ -37,74 +61,71 @@ class DocumentAgent(BaseAgent):
             "home": ["property", "residence", "house", "lease", "homeowner", "dwelling", "premises"]
         }
 
-        for url in claim_data.get("document_urls", []):
+        # Download -> OCR -> date extraction runs per document concurrently (bounded);
+        # results are merged below in input order so findings stay deterministic
+        semaphore = asyncio.Semaphore(self.max_concurrent_documents)
+
+        async def read_url(url):
+            async with semaphore:
+                artifact = await artifact_store.get(url)
+                return await self._read_document(artifact)
+
+        document_urls = claim_data.get("document_urls", [])
+        results = await asyncio.gather(*(read_url(url) for url in document_urls), return_exceptions=True)
+
+        texts_to_classify = []
+        for result in results:
             try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                content_type = response.headers.get("Content-Type", "")
-                text = ""
-                
-                # OCR Logic - removed hardcoded Windows path
-                if "pdf" in content_type.lower():
-                    try:
-                        # Assumes poppler is in system PATH (works in Docker/Linux)
-                        images = convert_from_bytes(response.content)
-                        for img in images:
-                            text += pytesseract.image_to_string(img) + "\n"
-                    except Exception as e:
-                        logger.warning(f"PDF OCR failed: {e}. Install poppler-utils for PDF support.")
-                        text = "[PDF OCR Failed - Poppler not available]"
-                else:
-                    img = Image.open(BytesIO(response.content))
-                    text = pytesseract.image_to_string(img)
+                if isinstance(result, Exception):
+                    raise result
+                text, document_dates = result
 
                 findings["text_extracted"].append(text[:500])  # Store snippet
                 
                 # --- CASE A: Date Validation (Backdating Detection) ---
                 if incident_date and len(text) > 20:
-                    # Extract all dates from document
-                    date_patterns = re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', text)
-                    date_patterns += re.findall(r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b', text)
-                    
-                    for date_str in date_patterns:
-                        parsed_date = dateparser.parse(date_str)
-                        if parsed_date:
-                            findings["extracted_dates"].append(parsed_date.strftime("%Y-%m-%d"))
-                            
-                            # Flag if document date is significantly AFTER incident date
-                            # (e.g., claim says Jan 1, 2025 but document dated Jan 1, 2024)
-                            if parsed_date < incident_date - timedelta(days=30):
-                                findings["red_flags"].append(
-                                    f"Document contains date {parsed_date.strftime('%Y-%m-%d')} which is >30 days before incident date {incident_date.strftime('%Y-%m-%d')}"
-                                )
-                                findings["validity"] = "suspicious"
+                    for date_str in document_dates:
+                        findings["extracted_dates"].append(date_str)
+                        parsed_date = datetime.strptime(date_str, "%Y-%m-%d")
+                        
+                        # Flag if document date is significantly AFTER incident date
+                        # (e.g., claim says Jan 1, 2025 but document dated Jan 1, 2024)
+                        if parsed_date.date() < (incident_date - timedelta(days=30)).date():
+                            findings["red_flags"].append(
+                                f"Document contains date {date_str} which is >30 days before incident date {incident_date.strftime('%Y-%m-%d')}"
+                            )
+                            findings["validity"] = "suspicious"
                 
-                # --- CASE B: Type Mismatch Detection (LLM-Based) ---
-                if len(text) > 50:  # Only check if substantial text extracted
-                    doc_type = await self._classify_document_type(text)
-                    findings["extracted_data"] = findings.get("extracted_data", {})
-                    findings["extracted_data"]["detected_type"] = doc_type
-                    
-                    # Check compatibility using intelligent mapping
-                    is_compatible = self._check_type_compatibility(claim_type, doc_type)
-                    
-                    if not is_compatible and doc_type != "UNKNOWN":
-                        # Provide helpful guidance instead of generic warning
-                        detected_claim_type = self._map_doc_type_to_claim_type(doc_type)
-                        findings["red_flags"].append(
-                            f"Document type mismatch: Document appears to be for {detected_claim_type} claim, but claim type is {claim_type}. Please verify claim type selection."
-                        )
-                        findings["document_type_matches"] = False
-                        logger.warning(f"⚠️ Type mismatch: {doc_type} detected but claim type is {claim_type}")
-                    elif is_compatible:
-                        logger.info(f"✅ Document type ({doc_type}) matches claim type ({claim_type})")
-                    else:
-                        logger.info(f"Document type unclear ({doc_type}) - giving benefit of doubt")
+                # Substantial text is classified below in a single batched LLM call
+                if len(text) > 50:
+                    texts_to_classify.append(text)
                 
             except Exception as e:
                 findings["validity"] = "error"
                 findings["red_flags"].append(f"Failed to process document: {str(e)}")
 
+        # --- CASE B: Type Mismatch Detection (LLM-Based) ---
+        doc_types = await self._classify_documents(texts_to_classify) if texts_to_classify else []
+        for doc_type in doc_types:
+            findings["extracted_data"] = findings.get("extracted_data", {})
+            findings["extracted_data"]["detected_type"] = doc_type
+            
+            # Check compatibility using intelligent mapping
+            is_compatible = self._check_type_compatibility(claim_type, doc_type)
+            
+            if not is_compatible and doc_type != "UNKNOWN":
+                # Provide helpful guidance instead of generic warning
+                detected_claim_type = self._map_doc_type_to_claim_type(doc_type)
+                findings["red_flags"].append(
+                    f"Document type mismatch: Document appears to be for {detected_claim_type} claim, but claim type is {claim_type}. Please verify claim type selection."
+                )
+                findings["document_type_matches"] = False
+                logger.warning(f"⚠️ Type mismatch: {doc_type} detected but claim type is {claim_type}")
+            elif is_compatible:
+                logger.info(f"✅ Document type ({doc_type}) matches claim type ({claim_type})")
+            else:
+                logger.info(f"Document type unclear ({doc_type}) - giving benefit of doubt")
+
         processing_time = (datetime.utcnow() - start_time).total_seconds()
         
         # Lower confidence if red flags found
@@ -112,8 +133,103 @@ class DocumentAgent(BaseAgent):
         
         return self._create_agent_report(confidence, findings, processing_time)
     
-    async def _classify_document_type(self, text: str) -> str:
+    async def _read_document(self, artifact) -> tuple:
+        """Return (text, dates) for a document, reusing cached OCR for identical bytes"""
+        cache_key = OCRCache.make_key(artifact.digest, ocr_engine.settings_key)
+        cached = await asyncio.to_thread(ocr_cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"OCR cache hit for {artifact.url}")
+            return "\n".join(cached["pages"]), cached["dates"]
+
+        try:
+            pages = await ocr_engine.extract_pages(artifact.content, artifact.content_type)
+        except Exception as e:
+            if "pdf" not in artifact.content_type.lower():
+                raise
+            # Assumes poppler is in system PATH (works in Docker/Linux)
+            logger.warning(f"PDF OCR failed: {e}. Install poppler-utils for PDF support.")
+            return "[PDF OCR Failed - Poppler not available]", []
+
+        text = "\n".join(page or "" for page in pages)
+        dates = self._extract_dates(text) if len(text) > 20 else []
+        # Only cache complete results so failed/timed-out pages get retried
+        if pages and all(page is not None for page in pages):
+            await asyncio.to_thread(ocr_cache.put, cache_key, pages, dates)
+        return text, dates
+
+    def _extract_dates(self, text: str) -> list:
+        """Find all dates in document text, normalized to YYYY-MM-DD"""
+        date_patterns = re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', text)
+        date_patterns += re.findall(r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b', text)
+        
+        dates = []
+        for date_str in date_patterns:
+            parsed_date = dateparser.parse(date_str)
+            if parsed_date:
+                dates.append(parsed_date.strftime("%Y-%m-%d"))
+        return dates
+
+    async def _classify_documents(self, texts: list) -> list:
+        """Classify all documents of a claim, using one LLM call for uncached texts"""
+        doc_types = [classification_cache.get(text) for text in texts]
+        pending = [i for i, doc_type in enumerate(doc_types) if doc_type is None]
+        if not pending:
+            return doc_types
+
+        if len(pending) == 1:
+            doc_types[pending[0]] = await self._classify_document_type(texts[pending[0]], use_cache=False)
+            return doc_types
+
+        batch_types = await self._classify_document_batch([texts[i] for i in pending])
+        if batch_types is None:
+            # Fall back to one call per document
+            for i in pending:
+                doc_types[i] = await self._classify_document_type(texts[i], use_cache=False)
+            return doc_types
+
+        for i, doc_type in zip(pending, batch_types):
+            doc_types[i] = doc_type
+            classification_cache.put(texts[i], doc_type)
+        return doc_types
+
+    async def _classify_document_batch(self, texts: list) -> Optional[list]:
+        """Classify several documents in one LLM request; None if the reply can't be used"""
+        try:
+            documents = "\n\n".join(
+                f"Document {i + 1} (first 1000 chars):\n{text[:1000]}" for i, text in enumerate(texts)
+            )
+            prompt = f"""Analyze each document below and classify it into ONE category.
+            
+            Context: These are documents attached to one insurance claim.
+            
+            {documents}
+            
+            Categories:
+{CATEGORY_LIST}
+            
+            Return ONLY a JSON array with one category name per document, in order
+            (e.g., ["MEDICAL_BILL", "INVOICE_RECEIPT"])."""
+            
+            response = await self.llm.ainvoke(prompt)
+            clean_response = response.content.replace("```json", "").replace("```", "").strip()
+            classifications = [normalize_document_type(str(c)) for c in json.loads(clean_response)]
+            
+            if len(classifications) != len(texts) or not all(classifications):
+                logger.warning(f"Batch classification returned unexpected result: {classifications}")
+                return None
+            logger.info(f"Documents classified as: {classifications}")
+            return classifications
+        except Exception as e:
+            logger.warning(f"Batch document classification failed, falling back to per-document: {e}")
+            return None
+
+    async def _classify_document_type(self, text: str, use_cache: bool = True) -> str:
         """Use LLM to classify document type intelligently"""
+        cached = classification_cache.get(text) if use_cache else None
+        if cached is not None:
+            logger.info(f"Document classified as: {cached} (cached template)")
+            return cached
+
         try:
             prompt = f"""Analyze this document text and classify it into ONE category.
             
@@ -123,18 +239,18 @@ class DocumentAgent(BaseAgent):
             {text[:1000]}
             
             Categories:
-            - AUTO_REPAIR_ESTIMATE (Car parts, garage, VIN, vehicle registration)
-            - HOME_INCIDENT_REPORT (HOA, Resident Association, Property damage, Address, Window/Roof/Leak/Breakage)
-            - MEDICAL_BILL (Hospital, Doctor, Diagnosis, Patient)
-            - POLICE_REPORT (Police, Officer, Case number)
-            - INVOICE_RECEIPT (Generic invoice, receipt)
-            - UNKNOWN (Cannot determine)
+{CATEGORY_LIST}
             
             Return ONLY the category name (e.g., HOME_INCIDENT_REPORT)."""
             
             response = await self.llm.ainvoke(prompt)
-            classification = response.content.strip()
+            classification = normalize_document_type(response.content)
+            if classification is None:
+                # Not cached: a one-off bad reply shouldn't stick to every similar document
+                logger.warning(f"Unrecognized document classification: {response.content.strip()[:100]}")
+                return "UNKNOWN"
             logger.info(f"Document classified as: {classification}")
+            classification_cache.put(text, classification)
             return classification
         except Exception as e:
             logger.error(f"Document classification failed: {e}")
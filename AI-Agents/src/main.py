@@ -6,12 +6,19 @@ import logging
 import os
 import json
 import asyncio
+import time
 from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 load_dotenv()
 
-from src.workflows.claim_workflow import ClaimProcessingWorkflow
-from src.models.claim_models import ClaimRequest, AIAssessmentResult
+from src.models.claim_models import ClaimRequest, AIAssessmentResult, WeatherPrefetchRequest
+from src.utils.fraud_policy import fraud_fast_path
+from src.utils.claim_history import claim_frequency_cache
+from src.utils.ocr_engine import ocr_engine
+from src.utils.ocr_cache import ocr_cache
+from src.utils.classification_cache import classification_cache
+from src.utils.weather_cache import weather_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,13 +39,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize workflow
-claim_workflow = ClaimProcessingWorkflow()
+# Workflow is built in the startup hook: the agents pull in LangGraph, OpenAI,
+# web3 and the imaging/OCR stack, so /health answers while they load and
+# /ready reports when claims can be processed
+claim_workflow = None
+workflow_error: Optional[str] = None
+workflow_ready = asyncio.Event()
+
+def _load_workflow():
+    from src.workflows.claim_workflow import ClaimProcessingWorkflow
+    return ClaimProcessingWorkflow()
+
+async def _warm_up():
+    global claim_workflow, workflow_error
+    started = time.perf_counter()
+    try:
+        claim_workflow = await asyncio.to_thread(_load_workflow)
+        logger.info(f"✅ Agents loaded in {time.perf_counter() - started:.2f}s")
+        if claim_workflow.async_anchoring:
+            from src.utils.chain_outbox import chain_outbox, start_outbox_workers
+            app.state.outbox_workers = start_outbox_workers(
+                chain_outbox, claim_workflow.blockchain_agent.process,
+                concurrency=int(os.getenv("CHAIN_OUTBOX_WORKERS", "2")),
+            )
+            logger.info("📬 Chain outbox workers started")
+    except Exception as e:
+        workflow_error = str(e)
+        logger.error(f"❌ Failed to load agents: {e}")
+    finally:
+        workflow_ready.set()
+
+async def get_workflow():
+    """Claim workflow, waiting for the startup load to finish if needed"""
+    await workflow_ready.wait()
+    if claim_workflow is None:
+        raise HTTPException(status_code=503, detail=f"Agents failed to load: {workflow_error}")
+    return claim_workflow
 
 # ✅ Prevent duplicate processing - track claims being processed
 processing_claims: set = set()
 processing_lock = asyncio.Lock()
 
+@app.on_event("startup")
+async def startup():
+    app.state.warm_up_task = asyncio.create_task(_warm_up())
+
+@app.on_event("shutdown")
+async def shutdown():
+    workers = getattr(app.state, "outbox_workers", [])
+    for task in workers:
+        task.cancel()
+    # Let cancelled workers hand their leases back before the loop closes
+    await asyncio.gather(*workers, return_exceptions=True)
+    from src.utils.clients import close_clients
+    await close_clients()
+    ocr_engine.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "DecentralizedClaim AI Agents API", "status": "running"}
@@ -47,6 +103,51 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
+@app.get("/ready")
+async def readiness_check():
+    if claim_workflow is None:
+        detail = f"Agents failed to load: {workflow_error}" if workflow_error else "Agents are loading"
+        raise HTTPException(status_code=503, detail=detail)
+    return {"status": "ready", "timestamp": datetime.utcnow().isoformat()}
+
+@app.get("/stats/cache")
+async def cache_stats():
+    from src.utils.artifact_store import artifact_store
+    from src.tools.price_tool import price_cache_stats
+    return {
+        "artifacts": artifact_store.stats(),
+        "ocr": ocr_cache.stats(),
+        "classification": classification_cache.stats(),
+        "weather": weather_cache.stats(),
+        "market_price": price_cache_stats(),
+        "claim_history": claim_frequency_cache.stats(),
+    }
+
+@app.get("/stats/fraud-fast-path")
+async def fraud_fast_path_stats():
+    return fraud_fast_path.stats()
+
+@app.get("/stats/chain")
+async def chain_stats():
+    """Nonce allocator, transaction throughput and outbox backlog"""
+    from src.utils.chain_outbox import chain_outbox
+    nonces = claim_workflow.blockchain_agent.nonces if claim_workflow else None
+    return {
+        "nonces": nonces.stats() if nonces else {"configured": False},
+        "outbox": chain_outbox.stats(),
+    }
+
+@app.post("/users/{user_id}/claim-history/invalidate")
+async def invalidate_claim_history(user_id: str):
+    """Drop the cached claim count, e.g. after claims are deleted or bulk-imported"""
+    return {"user_id": user_id, "invalidated": claim_frequency_cache.invalidate(user_id)}
+
+@app.post("/weather/prefetch")
+async def prefetch_weather(request: WeatherPrefetchRequest):
+    """Warm the weather cache before replaying a backlog of claims"""
+    from src.tools.weather_tool import prefetch_historical_weather
+    return await prefetch_historical_weather([(l.location, l.date) for l in request.lookups])
+
 @app.post("/process-claim", response_model=AIAssessmentResult)
 async def process_claim(request: ClaimRequest):
     logger.info(f"Received claim processing request for {request.claim_id}")
@@ -62,7 +163,8 @@ async def process_claim(request: ClaimRequest):
         processing_claims.add(request.claim_id)
     
     try:
-        result = await claim_workflow.process_claim(request.dict())
+        workflow = await get_workflow()
+        result = await workflow.process_claim(request.dict())
         return result
     finally:
         # ✅ Remove from processing set when done
@@ -70,6 +172,24 @@ async def process_claim(request: ClaimRequest):
             processing_claims.discard(request.claim_id)
             logger.info(f"✅ Claim {request.claim_id} processing completed and unlocked")
 
+@app.get("/claims/{claim_id}/chain-status")
+async def chain_status(claim_id: str):
+    """On-chain anchoring status for claims processed with CHAIN_ANCHOR_ASYNC"""
+    from src.utils.chain_outbox import chain_outbox
+    status = chain_outbox.get(claim_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Claim {claim_id} is not in the chain outbox")
+    return status
+
+@app.get("/chain/claims/{blockchain_claim_id}/reports")
+async def verify_agent_reports(blockchain_claim_id: int):
+    """Off-chain agent reports for a claim, checked against the on-chain Merkle root"""
+    workflow = await get_workflow()
+    try:
+        return await workflow.blockchain_agent.verify_report_commitment(blockchain_claim_id)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Could not read report commitment: {e}")
+
 @app.get("/claims/{claim_id}/stream-logs")
 async def stream_agent_logs(claim_id: str):
     """
@@ -97,7 +217,8 @@ async def stream_agent_logs(claim_id: str):
         
         try:
             # Use astream_events to get granular updates
-            async for event in claim_workflow.graph.astream_events(dummy_request, version="v1"):
+            workflow = await get_workflow()
+            async for event in workflow.graph.astream_events(dummy_request, version="v1"):
                 kind = event["event"]
                 name = event["name"]
                 
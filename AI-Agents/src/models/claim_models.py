@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -11,6 +11,7 @@ class ClaimRequest(BaseModel):
     damage_photo_urls: List[str] = []
     incident_date: Optional[str] = None
     location: Optional[str] = None
+    user_id: Optional[str] = None
 
 class AgentReport(BaseModel):
     confidence: float  # 0-1
@@ -27,4 +28,18 @@ class AIAssessmentResult(BaseModel):
     requires_human_review: bool
     agent_reports: dict  # {agent_name: AgentReport}
     processing_time: float  # seconds
-    metadata: dict = {}
\ No newline at end of file
+    metadata: dict = {}
+
+class WeatherLookup(BaseModel):
+    location: str
+    date: str  # YYYY-MM-DD
+
+    @field_validator("date")
+    @classmethod
+    def _check_date(cls, value: str) -> str:
+        # A malformed date would otherwise only fail inside the prefetch, after geocoding
+        datetime.strptime(value, "%Y-%m-%d")
+        return value
+
+class WeatherPrefetchRequest(BaseModel):
+    lookups: List[WeatherLookup]
@@ -1,17 +1,94 @@
 # src/tools/price_tool.py
+import asyncio
 import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict
 from langchain_core.tools import tool
-from tavily import TavilyClient
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Prices drift slowly, so identical searches are served from memory for a while
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", str(6 * 3600)))
+PRICE_CACHE_SIZE = int(os.getenv("PRICE_CACHE_SIZE", "512"))
+
+_tavily_client = None
+_search_cache: "OrderedDict[str, tuple]" = OrderedDict()  # normalized query -> (result, stored_at)
+_inflight: Dict[str, asyncio.Future] = {}
+_stats = {"hits": 0, "misses": 0, "shared_inflight": 0}
+
+
+def _get_tavily_client(api_key: str):
+    global _tavily_client
+    if _tavily_client is None:
+        from tavily import AsyncTavilyClient
+
+        _tavily_client = AsyncTavilyClient(api_key=api_key)
+    return _tavily_client
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+async def _search(query: str, api_key: str) -> dict:
+    """Tavily search with a TTL cache and de-duplication of concurrent identical queries"""
+    key = _normalize_query(query)
+
+    cached = _search_cache.get(key)
+    if cached and time.monotonic() - cached[1] < PRICE_CACHE_TTL:
+        _search_cache.move_to_end(key)
+        _stats["hits"] += 1
+        return cached[0]
+
+    while (pending := _inflight.get(key)) is not None:
+        _stats["shared_inflight"] += 1
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise  # this caller was cancelled
+            # The call doing the search was cancelled; run it ourselves
+
+    _stats["misses"] += 1
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        response = await _get_tavily_client(api_key).search(query=query, search_depth="basic", max_results=4)
+        _search_cache[key] = (response, time.monotonic())
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > PRICE_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+        future.set_result(response)
+        return response
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved when nobody else was waiting
+        raise
+    finally:
+        # Cancelled (a BaseException): release the waiters instead of leaving them hanging
+        if not future.done():
+            future.cancel()
+        _inflight.pop(key, None)
+
+
+def price_cache_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"] + _stats["shared_inflight"]
+    return {
+        "entries": len(_search_cache),
+        **_stats,
+        "hit_rate": round((_stats["hits"] + _stats["shared_inflight"]) / lookups, 3) if lookups else 0.0,
+    }
+
+
 @tool
-def verify_market_price(service_name: str, vehicle_info: str, location: str) -> str:
+async def verify_market_price(service_name: str, vehicle_info: str, location: str) -> str:
     """
-    Searches online for current market rates of vehicle repairs or medical procedures 
+    Searches online for current market rates of vehicle repairs or medical procedures
     to validate if a claim amount is inflated.
-    
+
     Args:
         service_name: The specific repair or service (e.g., "front bumper replacement", "root canal").
         vehicle_info: Car model/make or 'N/A' for health claims (e.g., "Renault Duster").
@@ -22,28 +99,26 @@ def verify_market_price(service_name: str, vehicle_info: str, location: str) ->
         if not api_key:
             logger.error("TAVILY_API_KEY not set in environment variables")
             return "Market price verification unavailable: API key not configured"
-        
-        tavily = TavilyClient(api_key=api_key)
-        
+
         # Construct a targeted search query
         query = f"average cost of {service_name} for {vehicle_info} in {location} price estimate"
         if vehicle_info == "N/A":
             query = f"average cost of {service_name} in {location} price"
 
         logger.info(f"Searching market prices: {query}")
-        
+
         # Search with Tavily
-        response = tavily.search(query=query, search_depth="basic", max_results=4)
-        
+        response = await _search(query, api_key)
+
         # Format the results for the LLM to analyze
         results_text = "\n".join([
-            f"- Source: {r['url']}\n  Snippet: {r['content']}" 
+            f"- Source: {r['url']}\n  Snippet: {r['content']}"
             for r in response.get('results', [])
         ])
-        
+
         if not results_text:
             return f"No market price data found for '{query}'"
-        
+
         return f"Market Price Search Results for '{query}':\n\n{results_text}"
 
     except Exception as e:
@@ -1,86 +1,231 @@
 # src/tools/weather_tool.py
-import httpx
+import asyncio
 import logging
+from typing import Dict, List, Optional, Tuple
 from langchain_core.tools import tool
 from datetime import datetime
+from src.utils.clients import get_http_client
+from src.utils.weather_cache import weather_cache
 
 logger = logging.getLogger(__name__)
 
+GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
+WEATHER_URL = "https://archive-api.open-meteo.com/v1/archive"
+DAILY_FIELDS = ["weather_code", "precipitation_sum", "wind_speed_10m_max"]
+
+
+async def _lookup_coordinates(name: str) -> Optional[dict]:
+    """Geocode a single place name (cached)"""
+    # Cache reads/writes are SQLite calls, so they run in a thread like the rest of the I/O here
+    cached = await asyncio.to_thread(weather_cache.get_geocode, name)
+    if cached:
+        return cached
+
+    geo_res = await get_http_client().get(GEO_URL, params={"name": name, "count": 1, "format": "json"})
+    geo_res.raise_for_status()
+    geo_data = geo_res.json()
+    if not geo_data.get("results"):
+        return None
+
+    result = {
+        "name": name,
+        "latitude": geo_data["results"][0]["latitude"],
+        "longitude": geo_data["results"][0]["longitude"],
+    }
+    await asyncio.to_thread(weather_cache.put_geocode, name, result["name"], result["latitude"], result["longitude"])
+    return result
+
+
+async def _geocode(location: str) -> Optional[dict]:
+    """Convert a location to lat/long, falling back to the last comma-separated part"""
+    geo = await _lookup_coordinates(location)
+    if geo:
+        return geo
+
+    # Fallback: Try extracting just the city name if full address fails
+    # e.g., "Bhumkar Chowk, Pune" -> "Pune"
+    if ',' in location:
+        fallback_location = location.split(',')[-1].strip()
+        logger.info(f"Location '{location}' not found, trying fallback: '{fallback_location}'")
+        geo = await _lookup_coordinates(fallback_location)
+        if geo:
+            # Remember the full address too so the next lookup is a single cache hit
+            await asyncio.to_thread(weather_cache.put_geocode, location, geo["name"], geo["latitude"], geo["longitude"])
+        return geo
+    return None
+
+
+def _daily_records(w_data: dict) -> dict:
+    """Split an archive response into {date: {field: value}}, skipping incomplete days"""
+    daily = w_data.get("daily", {})
+    records = {}
+    for i, day in enumerate(daily.get("time", [])):
+        record = {field: daily.get(field, [None] * (i + 1))[i] for field in DAILY_FIELDS}
+        # Recent days can be null until the archive catches up; don't cache them
+        if all(value is not None for value in record.values()):
+            records[day] = record
+    return records
+
+
+async def _fetch_range(lat: float, lon: float, start_date: str, end_date: str) -> dict:
+    """Fetch a date range from the archive in one request and cache every complete day"""
+    weather_params = {
+        "latitude": lat,
+        "longitude": lon,
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily": DAILY_FIELDS,
+        "timezone": "auto"
+    }
+    w_res = await get_http_client().get(WEATHER_URL, params=weather_params)
+    w_res.raise_for_status()
+    records = _daily_records(w_res.json())
+
+    if records:
+        await asyncio.to_thread(weather_cache.put_daily_many, lat, lon, records)
+    return records
+
+
+async def _fetch_daily(lat: float, lon: float, date: str) -> Optional[dict]:
+    """Daily weather record for one date (cached permanently)"""
+    cached = await asyncio.to_thread(weather_cache.get_daily, lat, lon, date)
+    if cached:
+        return cached
+
+    records = await _fetch_range(lat, lon, date, date)
+    return records.get(date)
+
+
+def _date_runs(dates: List[str], max_gap_days: int, max_range_days: int) -> List[Tuple[str, str]]:
+    """Group sorted YYYY-MM-DD dates into (start, end) ranges.
+
+    Dates up to max_gap_days apart share a range, since fetching a few extra
+    days costs far less than another request.
+    """
+    parsed = sorted({datetime.strptime(d, "%Y-%m-%d") for d in dates})
+    runs = []
+    start = end = parsed[0]
+    for day in parsed[1:]:
+        if (day - end).days <= max_gap_days and (day - start).days < max_range_days:
+            end = day
+        else:
+            runs.append((start, end))
+            start = end = day
+    runs.append((start, end))
+    return [(s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")) for s, e in runs]
+
+
+async def prefetch_historical_weather(lookups: List[Tuple[str, str]], max_gap_days: int = 7,
+                                      max_range_days: int = 366, concurrency: int = 4) -> dict:
+    """
+    Warm the weather cache for many (location, date) pairs, e.g. before replaying
+    a backlog of claims through fraud analysis.
+
+    Lookups are grouped by geocoded grid cell and each cell's missing dates are
+    fetched as a few contiguous ranges, so N claims cost roughly one request per
+    cell instead of one per claim.
+    """
+    summary = {"lookups": len(lookups), "cells": 0, "requests": 0, "already_cached": 0, "unresolved_locations": []}
+
+    # 1. Geocode each distinct location once, a few at a time
+    dates_by_location: Dict[str, set] = {}
+    for location, date in lookups:
+        dates_by_location.setdefault(location, set()).add(date)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def geocode(location):
+        async with semaphore:
+            try:
+                return await _geocode(location)
+            except Exception as e:
+                logger.error(f"Geocoding failed for '{location}': {e}")
+                return None
+
+    locations = sorted(dates_by_location)
+    geocoded = await asyncio.gather(*(geocode(location) for location in locations))
+
+    dates_by_cell: Dict[str, dict] = {}
+    for location, geo in zip(locations, geocoded):
+        if not geo:
+            summary["unresolved_locations"].append(location)
+            continue
+        cell = weather_cache.cell(geo["latitude"], geo["longitude"])
+        entry = dates_by_cell.setdefault(cell, {"latitude": geo["latitude"], "longitude": geo["longitude"], "dates": set()})
+        entry["dates"].update(dates_by_location[location])
+
+    # 2. Drop dates we already have, then fetch the rest as ranges
+    fetches = []
+    for entry in dates_by_cell.values():
+        dates = sorted(entry["dates"])
+        cached = await asyncio.to_thread(weather_cache.cached_dates, entry["latitude"], entry["longitude"], dates)
+        summary["already_cached"] += len(cached)
+        missing = [d for d in dates if d not in cached]
+        if missing:
+            for start_date, end_date in _date_runs(missing, max_gap_days, max_range_days):
+                fetches.append((entry["latitude"], entry["longitude"], start_date, end_date))
+    summary["cells"] = len(dates_by_cell)
+
+    async def fetch(lat, lon, start_date, end_date):
+        async with semaphore:
+            try:
+                await _fetch_range(lat, lon, start_date, end_date)
+            except Exception as e:
+                logger.error(f"Weather prefetch failed for {start_date}..{end_date}: {e}")
+
+    await asyncio.gather(*(fetch(*args) for args in fetches))
+    summary["requests"] = len(fetches)
+    logger.info(f"Weather prefetch: {summary['lookups']} lookups -> {summary['requests']} archive requests")
+    return summary
+
+
 @tool
 async def verify_historical_weather(location: str, date: str) -> str:
     """
     Retrieves historical weather data for a specific location and date to verify insurance claims.
     Useful for checking if it was actually raining, storming, or sunny on the incident date.
-    
+
     Args:
         location: The city or address (e.g., "Pune", "New York").
         date: The date in YYYY-MM-DD format.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            # 1. Geocoding (Convert Location to Lat/Long)
-            geo_url = "https://geocoding-api.open-meteo.com/v1/search"
-            geo_res = await client.get(geo_url, params={"name": location, "count": 1, "format": "json"})
-            geo_data = geo_res.json()
-
-            if not geo_data.get("results"):
-                # Fallback: Try extracting just the city name if full address fails
-                # e.g., "Bhumkar Chowk, Pune" -> "Pune"
-                if ',' in location:
-                    fallback_location = location.split(',')[-1].strip()
-                    logger.info(f"Location '{location}' not found, trying fallback: '{fallback_location}'")
-                    geo_res = await client.get(geo_url, params={"name": fallback_location, "count": 1, "format": "json"})
-                    geo_data = geo_res.json()
-                    
-                    if not geo_data.get("results"):
-                        return f"Could not find coordinates for location: {location} or {fallback_location}"
-                    location = fallback_location  # Update location name for report
-                else:
-                    return f"Could not find coordinates for location: {location}"
-
-            lat = geo_data["results"][0]["latitude"]
-            lon = geo_data["results"][0]["longitude"]
-
-            # 2. Weather Lookup (Historical)
-            weather_url = "https://archive-api.open-meteo.com/v1/archive"
-            weather_params = {
-                "latitude": lat,
-                "longitude": lon,
-                "start_date": date,
-                "end_date": date,
-                "daily": ["weather_code", "precipitation_sum", "wind_speed_10m_max"],
-                "timezone": "auto"
-            }
-            
-            w_res = await client.get(weather_url, params=weather_params)
-            w_data = w_res.json()
-
-            if "daily" not in w_data:
-                return f"No weather data found for {date}"
-
-            # 3. Interpret Data
-            precip = w_data["daily"]["precipitation_sum"][0]
-            wind = w_data["daily"]["wind_speed_10m_max"][0]
-            code = w_data["daily"]["weather_code"][0]
-
-            # WMO Weather Codes interpretation
-            condition = "Clear/Cloudy"
-            if code >= 51 and code <= 67: 
-                condition = "Rain"
-            elif code >= 71 and code <= 77: 
-                condition = "Snow"
-            elif code >= 80 and code <= 82: 
-                condition = "Heavy Showers"
-            elif code >= 95: 
-                condition = "Thunderstorm"
-
-            report = (
-                f"Weather Report for {location} on {date}:\n"
-                f"- Condition: {condition} (Code: {code})\n"
-                f"- Precipitation: {precip} mm\n"
-                f"- Max Wind Speed: {wind} km/h"
-            )
-            return report
+        # 1. Geocoding (Convert Location to Lat/Long)
+        geo = await _geocode(location)
+        if not geo:
+            if ',' in location:
+                return f"Could not find coordinates for location: {location} or {location.split(',')[-1].strip()}"
+            return f"Could not find coordinates for location: {location}"
+        location = geo["name"]  # Update location name for report
+
+        # 2. Weather Lookup (Historical)
+        daily = await _fetch_daily(geo["latitude"], geo["longitude"], date)
+        if not daily:
+            return f"No weather data found for {date}"
+
+        # 3. Interpret Data
+        precip = daily["precipitation_sum"]
+        wind = daily["wind_speed_10m_max"]
+        code = daily["weather_code"]
+
+        # WMO Weather Codes interpretation
+        condition = "Clear/Cloudy"
+        if code >= 51 and code <= 67:
+            condition = "Rain"
+        elif code >= 71 and code <= 77:
+            condition = "Snow"
+        elif code >= 80 and code <= 82:
+            condition = "Heavy Showers"
+        elif code >= 95:
+            condition = "Thunderstorm"
+
+        report = (
+            f"Weather Report for {location} on {date}:\n"
+            f"- Condition: {condition} (Code: {code})\n"
+            f"- Precipitation: {precip} mm\n"
+            f"- Max Wind Speed: {wind} km/h"
+        )
+        return report
 
     except Exception as e:
         logger.error(f"Weather tool error: {e}")
@@ -0,0 +1,198 @@
+# src/utils/artifact_store.py
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+import imagehash
+
+from .clients import get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class Artifact:
+    """Downloaded document/photo shared by every agent that needs it.
+
+    Raw bytes are fetched once; the decoded image and derived values
+    (EXIF, dimensions, phash, vision payloads) are computed lazily and memoized.
+    """
+
+    def __init__(self, url: str, content: bytes, content_type: str = ""):
+        self.url = url
+        self.content = content
+        self.content_type = content_type
+        self.digest = hashlib.sha256(content).hexdigest()
+        self._image: Optional[Image.Image] = None
+        self._metadata: Optional[dict] = None
+        self._phash: Optional[str] = None
+        self._vision_payloads: Dict[tuple, dict] = {}
+
+    @property
+    def size(self) -> int:
+        """Approximate memory footprint in bytes (raw + decoded + vision payloads)"""
+        total = len(self.content)
+        if self._image is not None:
+            width, height = self._image.size
+            total += width * height * len(self._image.getbands())
+        total += sum(len(p["base64"]) for p in self._vision_payloads.values())
+        return total
+
+    @property
+    def image(self) -> Image.Image:
+        if self._image is None:
+            img = Image.open(BytesIO(self.content))
+            img.load()
+            self._image = img
+        return self._image
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            img = self.image
+            exif_data = img._getexif() if hasattr(img, '_getexif') else None
+            self._metadata = {"has_exif": bool(exif_data), "dimensions": img.size}
+        return self._metadata
+
+    @property
+    def phash(self) -> str:
+        if self._phash is None:
+            self._phash = str(imagehash.phash(self.image))
+        return self._phash
+
+    def vision_payload(self, max_edge: int, image_format: str = "JPEG", quality: int = 85) -> dict:
+        """Downscaled, metadata-free re-encoding of the image for vision requests.
+
+        Returns {"mime_type", "base64", "bytes_saved"}. The re-encoding is
+        always sent, even when it is not smaller: the original bytes can carry
+        EXIF/GPS data. EXIF orientation is applied to the pixels first, so
+        dropping the tag doesn't leave phone photos sideways.
+        """
+        key = (max_edge, image_format.upper(), quality)
+        if key not in self._vision_payloads:
+            resized = ImageOps.exif_transpose(self.image)
+            if max(resized.size) > max_edge:
+                resized.thumbnail((max_edge, max_edge))
+            if resized.mode not in ("RGB", "L"):
+                resized = resized.convert("RGB")
+
+            # Saving without exif/icc drops metadata
+            buffer = BytesIO()
+            resized.save(buffer, format=key[1], quality=quality, optimize=True)
+            encoded = buffer.getvalue()
+
+            self._vision_payloads[key] = {
+                "mime_type": Image.MIME.get(key[1], "image/jpeg"),
+                "base64": base64.b64encode(encoded).decode('utf-8'),
+                "bytes_saved": len(self.content) - len(encoded),
+            }
+        return self._vision_payloads[key]
+
+
+class ArtifactStore:
+    """Process-wide LRU cache of downloaded artifacts, bounded by bytes.
+
+    Entries are content-addressed (SHA-256 of the body), so the same file
+    reached through different URLs, or by different claims, is stored once.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, timeout: int = 15):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._entries: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._url_index: Dict[str, str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bytes_fetched = 0
+        self.bytes_saved = 0
+
+    async def get(self, url: str) -> Artifact:
+        """Return the artifact for url, downloading it only on a cache miss.
+
+        Concurrent requests for a URL that is still downloading await the
+        same fetch instead of starting another one.
+        """
+        digest = self._url_index.get(url)
+        artifact = self._entries.get(digest) if digest else None
+        if artifact is not None:
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            self.bytes_saved += len(artifact.content)
+            return artifact
+
+        while (pending := self._inflight.get(url)) is not None:
+            try:
+                artifact = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this caller was cancelled
+                continue  # the downloading call was cancelled; fetch it ourselves
+            self.hits += 1
+            self.bytes_saved += len(artifact.content)
+            return artifact
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            artifact = await self._fetch(url)
+            future.set_result(artifact)
+            return artifact
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure doesn't warn at GC time
+            future.exception()
+            raise
+        finally:
+            # Cancelled (a BaseException): release the waiters instead of leaving them hanging
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(url, None)
+
+    async def _fetch(self, url: str) -> Artifact:
+        response = await get_http_client().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        fetched = Artifact(url, response.content, response.headers.get("Content-Type", ""))
+
+        self.misses += 1
+        self.bytes_fetched += len(fetched.content)
+        # Same content already cached under another URL: keep the existing entry
+        artifact = self._entries.get(fetched.digest, fetched)
+        self._entries[artifact.digest] = artifact
+        self._entries.move_to_end(artifact.digest)
+        self._url_index[url] = artifact.digest
+        self._evict()
+        return artifact
+
+    def _evict(self):
+        """Drop least recently used entries until the byte budget is met"""
+        total = sum(a.size for a in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            digest, evicted = self._entries.popitem(last=False)
+            total -= evicted.size
+            self._url_index = {u: d for u, d in self._url_index.items() if d != digest}
+            logger.debug(f"Evicted artifact {digest[:12]} ({evicted.url})")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes_cached": sum(a.size for a in self._entries.values()),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "bytes_fetched": self.bytes_fetched,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+# Shared by all agents in this process
+artifact_store = ArtifactStore(
+    max_bytes=int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+)
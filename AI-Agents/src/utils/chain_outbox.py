@@ -0,0 +1,224 @@
+# src/utils/chain_outbox.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+ANCHORED = "anchored"
+FAILED = "failed"
+
+
+class OutboxJob(NamedTuple):
+    claim_id: str
+    state: dict
+    attempts: int
+    lease: str  # token proving this worker still owns the row
+    tx_hash: Optional[str]  # assessment tx broadcast by an earlier attempt
+    blockchain_claim_id: Optional[int]  # on-chain ID chosen by an earlier attempt
+
+
+class ChainOutbox:
+    """Durable queue of on-chain writes, so claim responses don't wait for confirmations.
+
+    One row per claim. Re-queuing a claim only refreshes the payload while the
+    row is still pending; rows being anchored, anchored or failed are left
+    alone. Workers claim a row with a single conditional UPDATE and hold it
+    under a lease, so several workers or processes can share the file; a row
+    whose lease ran out (crashed worker) is picked up again.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 8, retry_base_delay: float = 15,
+                 lease_seconds: float = 600):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chain_outbox (
+                claim_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                tx_hash TEXT,
+                blockchain_claim_id INTEGER,
+                error TEXT,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_until REAL
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chain_outbox)")}
+        for column, column_type in (("lease_owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE chain_outbox ADD COLUMN {column} {column_type}")
+        self._conn.commit()
+
+    def enqueue(self, claim_id: str, state: dict) -> bool:
+        """Queue a claim; returns False when it is already being anchored, anchored or failed"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO chain_outbox (claim_id, payload, status, attempts, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 0, ?, ?, ?) "
+                "ON CONFLICT(claim_id) DO UPDATE SET payload = excluded.payload, updated_at = excluded.updated_at "
+                "WHERE chain_outbox.status = ?",
+                (claim_id, json.dumps(state, default=str), PENDING, now, now, now, PENDING),
+            )
+            self._conn.commit()
+        if cursor.rowcount == 0:
+            logger.info(f"📬 Claim {claim_id} already past pending in the chain outbox - not re-queued")
+            return False
+        logger.info(f"📬 Claim {claim_id} queued for on-chain anchoring")
+        return True
+
+    def take_next(self) -> Optional[OutboxJob]:
+        """Lease the oldest due row (pending, or in_progress with an expired lease)"""
+        now = time.time()
+        lease = uuid.uuid4().hex
+        with self._lock:
+            row = self._conn.execute(
+                "UPDATE chain_outbox SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_until = ?, updated_at = ? "
+                "WHERE claim_id = ("
+                "  SELECT claim_id FROM chain_outbox "
+                "  WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until <= ?) "
+                "  ORDER BY next_attempt_at ASC LIMIT 1"
+                ") "
+                "RETURNING claim_id, payload, attempts, tx_hash, blockchain_claim_id",
+                (IN_PROGRESS, lease, now + self.lease_seconds, now, PENDING, now, IN_PROGRESS, now),
+            ).fetchone()
+            self._conn.commit()
+        if row is None:
+            return None
+        return OutboxJob(row[0], json.loads(row[1]), row[2], lease, row[3], row[4])
+
+    def record_attempt(self, claim_id: str, lease: str, blockchain_claim_id: int, tx_hash: Optional[str] = None) -> bool:
+        """Persist the on-chain ID and assessment tx hash before it is broadcast; also renews the lease"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE chain_outbox SET blockchain_claim_id = ?, tx_hash = COALESCE(?, tx_hash), "
+                "lease_until = ?, updated_at = ? WHERE claim_id = ? AND lease_owner = ? AND status = ?",
+                (blockchain_claim_id, tx_hash, now + self.lease_seconds, now, claim_id, lease, IN_PROGRESS),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def mark_anchored(self, claim_id: str, lease: str, tx_hash: Optional[str], blockchain_claim_id: Optional[int]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE chain_outbox SET status = ?, tx_hash = ?, blockchain_claim_id = ?, error = NULL, "
+                "lease_owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE claim_id = ? AND lease_owner = ? AND status = ?",
+                (ANCHORED, tx_hash, blockchain_claim_id, time.time(), claim_id, lease, IN_PROGRESS),
+            )
+            self._conn.commit()
+
+    def mark_failed(self, claim_id: str, lease: str, attempts: int, error: str):
+        """Schedule a retry with exponential backoff, or give up after max_attempts"""
+        status = FAILED if attempts >= self.max_attempts else PENDING
+        next_attempt_at = time.time() + self.retry_base_delay * 2 ** (attempts - 1)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE chain_outbox SET status = ?, error = ?, next_attempt_at = ?, "
+                "lease_owner = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE claim_id = ? AND lease_owner = ? AND status = ?",
+                (status, error[:500], next_attempt_at, time.time(), claim_id, lease, IN_PROGRESS),
+            )
+            self._conn.commit()
+        return status
+
+    def get(self, claim_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, attempts, tx_hash, blockchain_claim_id, error, created_at, updated_at "
+                "FROM chain_outbox WHERE claim_id = ?",
+                (claim_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "claim_id": claim_id,
+            "status": row[0],
+            "attempts": row[1],
+            "tx_hash": row[2],
+            "blockchain_claim_id": row[3],
+            "error": row[4],
+            "queued_at": row[5],
+            "updated_at": row[6],
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM chain_outbox GROUP BY status").fetchall()
+        return {status: 0 for status in (PENDING, IN_PROGRESS, ANCHORED, FAILED)} | dict(rows)
+
+
+async def run_outbox_worker(outbox: ChainOutbox, anchor: Callable[..., Awaitable[dict]],
+                            poll_interval: float = 2.0):
+    """Drain the outbox forever; anchor() is BlockchainAgent.process.
+
+    Each attempt is checkpointed before broadcast, and a retry gets the
+    previous attempt's tx hash and on-chain ID, so it can confirm that
+    transaction instead of sending a second claim. SQLite calls (which may
+    wait up to 30s on a lock held by another process) run in a thread.
+    """
+    while True:
+        job = await asyncio.to_thread(outbox.take_next)
+        if job is None:
+            await asyncio.sleep(poll_interval)
+            continue
+
+        async def checkpoint(blockchain_claim_id: int, tx_hash: Optional[str] = None):
+            if not await asyncio.to_thread(outbox.record_attempt, job.claim_id, job.lease, blockchain_claim_id, tx_hash):
+                raise RuntimeError(f"Lease on claim {job.claim_id} lost - another worker took it over")
+
+        previous_attempt = None
+        if job.blockchain_claim_id is not None:
+            previous_attempt = {"tx_hash": job.tx_hash, "blockchain_claim_id": job.blockchain_claim_id}
+        try:
+            report = await anchor(job.state, previous_attempt=previous_attempt, checkpoint=checkpoint)
+            findings = report.get("findings", {})
+            if findings.get("status") == "success":
+                await asyncio.to_thread(outbox.mark_anchored, job.claim_id, job.lease,
+                                        findings.get("tx_hash"), findings.get("blockchain_claim_id"))
+                logger.info(f"⛓️ Claim {job.claim_id} anchored on-chain: {findings.get('tx_hash')}")
+                continue
+            error = findings.get("error", "Blockchain update failed")
+        except asyncio.CancelledError:
+            # Release the lease before stopping; shielded so the write finishes even if cancelled again
+            await asyncio.shield(asyncio.to_thread(outbox.mark_failed, job.claim_id, job.lease, 0, "Worker stopped"))
+            raise
+        except Exception as e:
+            error = str(e)
+
+        status = await asyncio.to_thread(outbox.mark_failed, job.claim_id, job.lease, job.attempts, error)
+        logger.warning(f"⚠️ Anchoring claim {job.claim_id} failed (attempt {job.attempts}, now {status}): {error}")
+
+
+def start_outbox_workers(outbox: ChainOutbox, anchor: Callable[..., Awaitable[dict]],
+                         concurrency: int = 1) -> List[asyncio.Task]:
+    return [asyncio.create_task(run_outbox_worker(outbox, anchor)) for _ in range(concurrency)]
+
+
+chain_outbox = ChainOutbox(
+    path=os.getenv("CHAIN_OUTBOX_PATH", ".cache/chain_outbox.sqlite3"),
+    max_attempts=int(os.getenv("CHAIN_OUTBOX_MAX_ATTEMPTS", "8")),
+    retry_base_delay=float(os.getenv("CHAIN_OUTBOX_RETRY_DELAY", "15")),
+    lease_seconds=float(os.getenv("CHAIN_OUTBOX_LEASE", "600")),
+)
@@ -0,0 +1,114 @@
+# src/utils/claim_history.py
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ClaimFrequencyCache:
+    """Per-user count of claims in the look-back window, kept as a local rolling counter.
+
+    A fresh count is fetched from Supabase at most once per TTL. While it is
+    fresh, every claim_id not seen before for that user bumps the counter by
+    one instead of triggering another count query. The TTL bounds drift from
+    claims aging out of the window or being deleted elsewhere; invalidate()
+    drops a user immediately.
+    """
+
+    def __init__(self, ttl: float = 300, max_users: int = 10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # user_id -> {count, claim_ids, fetched_at}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared_inflight = 0
+        self.local_increments = 0
+
+    def _fresh_entry(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry["fetched_at"] >= self.ttl:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def _count_for(self, entry: dict, claim_id: Optional[str]) -> int:
+        if claim_id and claim_id not in entry["claim_ids"]:
+            entry["claim_ids"].add(claim_id)
+            entry["count"] += 1
+            self.local_increments += 1
+        return entry["count"]
+
+    async def get_count(self, user_id: str, claim_id: Optional[str],
+                        fetch: Callable[[], Awaitable[int]]) -> int:
+        """Claim count for user_id, counting claim_id once; fetch() runs only on a miss.
+
+        The fetched count is assumed to already include claim_id (the backend
+        records the claim before asking for an assessment).
+        """
+        entry = self._fresh_entry(user_id)
+        if entry is not None:
+            self.hits += 1
+            return self._count_for(entry, claim_id)
+
+        while (pending := self._inflight.get(user_id)) is not None:
+            self.shared_inflight += 1
+            try:
+                await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this caller was cancelled
+                continue  # the fetching call was cancelled; query ourselves
+            entry = self._fresh_entry(user_id)
+            return self._count_for(entry, claim_id) if entry else pending.result()
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            count = await fetch()
+            self._entries[user_id] = {
+                "count": count,
+                "claim_ids": {claim_id} if claim_id else set(),
+                "fetched_at": time.monotonic(),
+            }
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+            future.set_result(count)
+            return count
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            # Cancelled (a BaseException): release the waiters instead of leaving them hanging
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(user_id, None)
+
+    def invalidate(self, user_id: str) -> bool:
+        return self._entries.pop(user_id, None) is not None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.shared_inflight
+        return {
+            "users": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_inflight": self.shared_inflight,
+            "local_increments": self.local_increments,
+            "hit_rate": round((self.hits + self.shared_inflight) / lookups, 3) if lookups else 0.0,
+        }
+
+
+claim_frequency_cache = ClaimFrequencyCache(
+    ttl=float(os.getenv("CLAIM_HISTORY_TTL", "300")),
+    max_users=int(os.getenv("CLAIM_HISTORY_MAX_USERS", "10000")),
+)
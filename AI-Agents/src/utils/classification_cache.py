@@ -0,0 +1,91 @@
+# src/utils/classification_cache.py
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_DIGIT_RE = re.compile(r"\d")
+
+
+def text_fingerprint(text: str, length: int = 1000) -> int:
+    """64-bit SimHash of the normalized leading text of a document.
+
+    Digits are collapsed so the same template with different amounts, dates
+    or IDs lands on (nearly) the same fingerprint.
+    """
+    normalized = _DIGIT_RE.sub("0", text[:length].lower())
+    words = _WORD_RE.findall(normalized)
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class ClassificationCache:
+    """LRU + TTL cache of document classifications keyed by SimHash.
+
+    A lookup hits when a cached fingerprint is within max_distance bits of
+    the query, so near-identical templates share one LLM classification.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 24 * 3600, max_distance: int = 10):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # fingerprint -> (label, stored_at)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> Optional[str]:
+        fingerprint = text_fingerprint(text)
+        now = time.monotonic()
+        match = None
+        for cached_fp, (label, stored_at) in list(self._entries.items()):
+            if now - stored_at > self.ttl:
+                del self._entries[cached_fp]
+                continue
+            if match is None and bin(cached_fp ^ fingerprint).count("1") <= self.max_distance:
+                match = (cached_fp, label)
+
+        if match is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(match[0])
+        self.hits += 1
+        return match[1]
+
+    def put(self, text: str, label: str):
+        fingerprint = text_fingerprint(text)
+        self._entries[fingerprint] = (label, time.monotonic())
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+classification_cache = ClassificationCache(
+    max_entries=int(os.getenv("CLASSIFICATION_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CLASSIFICATION_CACHE_TTL", str(24 * 3600))),
+    max_distance=int(os.getenv("CLASSIFICATION_CACHE_MAX_DISTANCE", "10")),
+)
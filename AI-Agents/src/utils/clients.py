@@ -0,0 +1,109 @@
+# src/utils/clients.py
+# Process-wide client registry: clients are built on first use and shared by
+# every agent and tool, so there is one connection pool per upstream service.
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+OPENAI_POOL_MAX_CONNECTIONS = int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "50"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+DEFAULT_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_http_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[AsyncOpenAI] = None
+_chat_llms: Dict[Tuple[str, float], object] = {}
+_supabase_client = None
+_supabase_checked = False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled async HTTP client for artifact downloads and tool calls"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=15.0,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+            ),
+        )
+    return _http_client
+
+
+def _get_openai_http_client() -> httpx.AsyncClient:
+    """Connection pool shared by every OpenAI caller (vision requests and all chat models)"""
+    global _openai_http_client
+    if _openai_http_client is None or _openai_http_client.is_closed:
+        _openai_http_client = httpx.AsyncClient(
+            timeout=OPENAI_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=OPENAI_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_POOL_MAX_CONNECTIONS,
+            ),
+        )
+    return _openai_http_client
+
+
+def get_async_openai() -> AsyncOpenAI:
+    """Shared AsyncOpenAI client for vision requests"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=_get_openai_http_client())
+    return _openai_client
+
+
+def get_chat_llm(model: str = DEFAULT_CHAT_MODEL, temperature: float = 0.1):
+    """Shared ChatOpenAI per (model, temperature), all on the same OpenAI connection pool"""
+    key = (model, temperature)
+    if key not in _chat_llms:
+        from langchain_openai import ChatOpenAI
+
+        _chat_llms[key] = ChatOpenAI(
+            model=model,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            temperature=temperature,
+            http_async_client=_get_openai_http_client(),
+        )
+        logger.info(f"Chat model initialized: {model} (temperature={temperature})")
+    return _chat_llms[key]
+
+
+def get_supabase():
+    """Shared Supabase client, or None when credentials are not configured"""
+    global _supabase_client, _supabase_checked
+    if not _supabase_checked:
+        _supabase_checked = True
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        if url and key:
+            from supabase import create_client
+
+            _supabase_client = create_client(url, key)
+        else:
+            logger.warning("Supabase credentials missing - historical checks disabled")
+    return _supabase_client
+
+
+async def close_clients():
+    """Close pooled connections (called on application shutdown)"""
+    global _http_client, _openai_http_client, _openai_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+    if _openai_http_client is not None:
+        await _openai_http_client.aclose()
+        _openai_http_client = None
+    _chat_llms.clear()
+    logger.info("Shared HTTP clients closed")
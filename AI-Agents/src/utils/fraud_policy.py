@@ -0,0 +1,79 @@
+# src/utils/fraud_policy.py
+import logging
+import os
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+LLM_PATH = "llm"
+FAST_REJECT = "fast_reject"
+FAST_APPROVE = "fast_approve"
+
+
+class FastPathPolicy:
+    """Decides from the deterministic (pre-LLM) fraud score whether the LLM/tool stage can be skipped.
+
+    - fast_reject: the LLM stage can only add risk, so once the pre-LLM score
+      reaches reject_score (default 71, i.e. already past the >70 fraud
+      threshold) the verdict cannot change.
+    - fast_approve: claims at or below approve_max_amount with no red flags.
+      This one can miss LLM/tool-only findings, so it is off unless configured.
+    """
+
+    def __init__(self, enabled: bool = True, reject_score: int = 71, approve_max_amount: float = 0):
+        self.enabled = enabled
+        self.reject_score = reject_score
+        self.approve_max_amount = approve_max_amount
+        self.counts = {LLM_PATH: 0, FAST_REJECT: 0, FAST_APPROVE: 0}
+
+    def decide(self, pre_llm_score: int, red_flag_count: int, requested_amount: float) -> str:
+        if self.enabled:
+            if pre_llm_score >= self.reject_score:
+                return FAST_REJECT
+            if red_flag_count == 0 and 0 < requested_amount <= self.approve_max_amount:
+                return FAST_APPROVE
+        return LLM_PATH
+
+    def record(self, path: str):
+        self.counts[path] += 1
+
+    @staticmethod
+    def _summary(counts: dict) -> dict:
+        total = sum(counts.values())
+        skipped = counts[FAST_REJECT] + counts[FAST_APPROVE]
+        return {
+            "decisions": dict(counts),
+            "total": total,
+            "llm_calls_skipped": skipped,
+            "llm_call_rate_saved": round(skipped / total, 3) if total else 0.0,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "reject_score": self.reject_score,
+            "approve_max_amount": self.approve_max_amount,
+            **self._summary(self.counts),
+        }
+
+    def replay(self, fraud_findings: List[dict]) -> dict:
+        """Evaluate the policy over historical fraud_agent findings without touching live counters.
+
+        Each entry needs "pre_llm_risk_score", "pre_llm_red_flag_count" and "requested_amount".
+        """
+        counts = {LLM_PATH: 0, FAST_REJECT: 0, FAST_APPROVE: 0}
+        for findings in fraud_findings:
+            path = self.decide(
+                findings.get("pre_llm_risk_score", 0),
+                findings.get("pre_llm_red_flag_count", 0),
+                findings.get("requested_amount", 0),
+            )
+            counts[path] += 1
+        return self._summary(counts)
+
+
+fraud_fast_path = FastPathPolicy(
+    enabled=os.getenv("FRAUD_FAST_PATH", "true").lower() == "true",
+    reject_score=int(os.getenv("FRAUD_FAST_REJECT_SCORE", "71")),
+    approve_max_amount=float(os.getenv("FRAUD_FAST_APPROVE_MAX_AMOUNT", "0")),
+)
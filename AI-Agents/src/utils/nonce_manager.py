@@ -0,0 +1,186 @@
+# src/utils/nonce_manager.py
+import asyncio
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Set
+
+from web3.exceptions import Web3RPCError
+
+logger = logging.getLogger(__name__)
+
+_ALREADY_KNOWN = ("already known", "known transaction", "already imported")
+
+
+class NonceManager:
+    """Process-wide nonce allocator for one signing account.
+
+    Nonces are handed out under a lock, so concurrent claims never sign two
+    transactions with the same nonce. A nonce whose transaction was never
+    broadcast is released and reused by the next allocation; otherwise every
+    later transaction would sit behind the gap. "nonce too low" means another
+    signer used the account, so the counter is resynced from the chain.
+
+    Signed transactions are kept until their receipt arrives. After a receipt
+    timeout, recover() compares the node's pending nonce with the local
+    counter and re-broadcasts any of ours the node has dropped. A broadcast
+    that failed without a verdict from the node (timeout, dropped connection)
+    may still have reached the mempool, so its nonce is kept the same way
+    instead of being handed out again.
+    """
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._lock = asyncio.Lock()
+        self._next: Optional[int] = None
+        self._released: List[int] = []  # min-heap of nonces to fill first
+        self._outstanding: Set[int] = set()  # allocated, not yet broadcast or released
+        self._unconfirmed: Dict[int, tuple] = {}  # nonce -> (tx_hash, raw signed tx) awaiting a receipt
+        self.allocated = 0
+        self.sent = 0
+        self.gaps_recovered = 0
+        self.resyncs = 0
+        self.rebroadcasts = 0
+        self.uncertain_sends = 0
+        self._first_sent_at: Optional[float] = None
+        self._last_sent_at: Optional[float] = None
+
+    async def _chain_nonce(self, block: str = "pending") -> int:
+        return await self.w3.eth.get_transaction_count(self.address, block)
+
+    async def _resync(self):
+        chain_nonce = await self._chain_nonce()
+        self._released = [n for n in self._released if n >= chain_nonce]
+        heapq.heapify(self._released)
+        if self._next is None or chain_nonce > self._next:
+            self._next = chain_nonce
+        self.resyncs += 1
+        logger.info(f"🔄 Nonce resynced from chain: next={self._next}")
+
+    async def allocate(self) -> int:
+        async with self._lock:
+            if self._next is None:
+                self._next = await self._chain_nonce()
+            if self._released:
+                self.gaps_recovered += 1
+                nonce = heapq.heappop(self._released)
+            else:
+                nonce = self._next
+                self._next += 1
+            self._outstanding.add(nonce)
+            self.allocated += 1
+            return nonce
+
+    async def release(self, nonce: int, error: Optional[Exception] = None):
+        """Return a nonce whose transaction was not broadcast"""
+        async with self._lock:
+            self._outstanding.discard(nonce)
+            if error is not None and "nonce too low" in str(error).lower():
+                await self._resync()
+            elif self._next is not None and nonce < self._next:
+                heapq.heappush(self._released, nonce)
+
+    async def send_failed(self, nonce: int, error: Exception, tx_hash: bytes, raw_tx: bytes) -> bool:
+        """send_raw_transaction raised: release the nonce only if the node definitely rejected the tx.
+
+        Returns True when the node already has the transaction, i.e. it counts as sent.
+        """
+        message = str(error).lower()
+        if any(known in message for known in _ALREADY_KNOWN):
+            self.record_sent(nonce, tx_hash, raw_tx)
+            return True
+        if isinstance(error, (Web3RPCError, ValueError)):
+            # The node answered with an error, so the tx is not in its mempool
+            await self.release(nonce, error)
+        else:
+            self._track(nonce, tx_hash, raw_tx)
+            self.uncertain_sends += 1
+            logger.warning(f"⚠️ Broadcast of nonce {nonce} may or may not have reached the node ({error}) - holding it")
+        return False
+
+    def _track(self, nonce: int, tx_hash: bytes, raw_tx: bytes):
+        self._outstanding.discard(nonce)
+        self._unconfirmed[nonce] = (bytes(tx_hash), bytes(raw_tx))
+
+    def record_sent(self, nonce: int, tx_hash: bytes, raw_tx: bytes):
+        self._track(nonce, tx_hash, raw_tx)
+        now = time.monotonic()
+        if self._first_sent_at is None:
+            self._first_sent_at = now
+        self._last_sent_at = now
+        self.sent += 1
+
+    def confirm(self, tx_hash: bytes):
+        """Receipt received: stop tracking the transaction"""
+        tx_hash = bytes(tx_hash)
+        for nonce, (sent_hash, _) in list(self._unconfirmed.items()):
+            if sent_hash == tx_hash:
+                del self._unconfirmed[nonce]
+
+    def _forget_mined(self, latest: int):
+        for nonce in [n for n in self._unconfirmed if n < latest]:
+            del self._unconfirmed[nonce]
+        self._released = [n for n in self._released if n >= latest]
+        heapq.heapify(self._released)
+
+    async def recover(self) -> dict:
+        """Reconcile with the node after a receipt timeout or a dropped transaction.
+
+        The pending nonce only counts transactions the node still has in an
+        unbroken sequence. Ours at or above it were dropped (or are queued
+        behind one that was), so they are re-broadcast from the same signed
+        bytes (same hash, so never a second copy). Afterwards the counts are
+        read again, since re-broadcasts and receipts arriving meanwhile move
+        them, and a nonce from there up to the counter that nobody holds is
+        queued for reuse. Nothing below the fresh mined count is ever reused.
+        """
+        async with self._lock:
+            latest = await self._chain_nonce("latest")
+            pending = await self._chain_nonce()
+            self._forget_mined(latest)
+
+            rebroadcast = []
+            for nonce in sorted(n for n in self._unconfirmed if n >= pending):
+                entry = self._unconfirmed.get(nonce)
+                if entry is None:
+                    continue  # receipt arrived while we were re-broadcasting
+                try:
+                    await self.w3.eth.send_raw_transaction(entry[1])
+                    rebroadcast.append(nonce)
+                except Exception as e:
+                    message = str(e).lower()
+                    if "nonce too low" in message:
+                        self._unconfirmed.pop(nonce, None)  # mined meanwhile
+                    elif not any(known in message for known in _ALREADY_KNOWN):
+                        logger.warning(f"⚠️ Re-broadcast of nonce {nonce} failed: {e}")
+            self.rebroadcasts += len(rebroadcast)
+
+            latest = await self._chain_nonce("latest")
+            pending = await self._chain_nonce()
+            self._forget_mined(latest)
+            if self._next is None or pending > self._next:
+                self._next = pending
+            held = set(self._unconfirmed) | self._outstanding | set(self._released)
+            holes = [n for n in range(pending, self._next) if n not in held]
+            for nonce in holes:
+                heapq.heappush(self._released, nonce)
+
+        if rebroadcast or holes:
+            logger.warning(f"🩹 Nonce gap at {pending}: re-broadcast {rebroadcast}, reusing {holes}")
+        return {"latest": latest, "pending": pending, "next": self._next,
+                "rebroadcast": rebroadcast, "reused": holes}
+
+    def stats(self) -> dict:
+        window = (self._last_sent_at - self._first_sent_at) if self.sent > 1 else 0
+        return {
+            "next_nonce": self._next,
+            "allocated": self.allocated,
+            "sent": self.sent,
+            "unconfirmed": len(self._unconfirmed),
+            "gaps_recovered": self.gaps_recovered,
+            "rebroadcasts": self.rebroadcasts,
+            "uncertain_sends": self.uncertain_sends,
+            "resyncs": self.resyncs,
+            "tx_per_second": round((self.sent - 1) / window, 3) if window > 0 else 0.0,
+        }
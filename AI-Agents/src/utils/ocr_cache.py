@@ -0,0 +1,107 @@
+# src/utils/ocr_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """On-disk OCR result cache keyed by document SHA-256 plus OCR settings.
+
+    Stores per-page text and detected dates so resubmitted or retried
+    documents skip tesseract entirely. Least recently used rows are evicted
+    once the stored payload exceeds max_bytes. Hits only note their access
+    time in memory; those are written back in bulk on the next put(), which
+    is the only place eviction reads them.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._accessed = {}  # key -> last hit time not yet written to SQLite
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_results (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content_digest: str, settings: str) -> str:
+        return hashlib.sha256(f"{content_digest}:{settings}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM ocr_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._accessed[key] = time.time()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, pages: List[str], dates: List[str]):
+        payload = json.dumps({"pages": pages, "dates": dates})
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE ocr_results SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM ocr_results ORDER BY last_access ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM ocr_results WHERE key = ?", evicted)
+        logger.info(f"OCR cache evicted {len(evicted)} entries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes_cached": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+ocr_cache = OCRCache(
+    path=os.getenv("OCR_CACHE_PATH", ".cache/ocr_cache.sqlite3"),
+    max_bytes=int(os.getenv("OCR_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
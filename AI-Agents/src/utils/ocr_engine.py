@@ -0,0 +1,151 @@
+# src/utils/ocr_engine.py
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Worker functions live at module level so the process pool can pickle them.
+# Heavy imports stay inside so only worker processes pay for them.
+def _downscale(img, max_edge: int):
+    if max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge))
+    return img
+
+
+# `timeout` is passed on to poppler/tesseract, which kill their subprocess when
+# it expires, so a worker never stays busy on a page the caller gave up on.
+def _ocr_pdf_page(pdf_path: str, page_number: int, dpi: int, max_edge: int, timeout: float) -> str:
+    """Render a single PDF page and OCR it"""
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number, timeout=timeout)
+    if not images:
+        return ""
+    return pytesseract.image_to_string(_downscale(images[0], max_edge), timeout=timeout)
+
+
+def _ocr_image(content: bytes, max_edge: int, timeout: float) -> str:
+    import pytesseract
+    from PIL import Image
+
+    img = Image.open(BytesIO(content))
+    return pytesseract.image_to_string(_downscale(img, max_edge), timeout=timeout)
+
+
+def _pdf_page_count(pdf_path: str, timeout: float) -> int:
+    from pdf2image import pdfinfo_from_path
+
+    return int(pdfinfo_from_path(pdf_path, timeout=timeout).get("Pages", 0))
+
+
+def _write_temp_pdf(content: bytes) -> str:
+    with tempfile.NamedTemporaryFile(prefix="ocr-", suffix=".pdf", delete=False) as f:
+        f.write(content)
+        return f.name
+
+
+class OCREngine:
+    """OCR backed by a process pool so PDF pages are processed in parallel across cores.
+
+    Workers are spawned rather than forked, so they don't inherit the event
+    loop, open sockets and SQLite handles of the server process. A PDF is
+    written to a temp file once and each page task only carries its path,
+    instead of pickling the whole document to a worker for every page.
+
+    The timeout is enforced inside the workers as well: cancelling a task
+    only drops it from the queue, so each poppler/tesseract call carries the
+    same deadline and is killed when it runs past it.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, dpi: int = 200,
+                 max_edge: int = 2500, max_pages: int = 20, timeout: float = 120.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.dpi = dpi
+        self.max_edge = max_edge
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def settings_key(self) -> str:
+        """Settings that change OCR output; part of the OCR cache key"""
+        return f"dpi={self.dpi}:max_edge={self.max_edge}:max_pages={self.max_pages}"
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"OCR process pool started with {self.max_workers} workers")
+        return self._executor
+
+    async def extract_pages(self, content: bytes, content_type: str) -> List[Optional[str]]:
+        """OCR a PDF or image and return the text of each page.
+
+        Pages that failed or did not finish within the timeout come back as None.
+        """
+        loop = asyncio.get_running_loop()
+
+        if "pdf" not in content_type.lower():
+            task = loop.run_in_executor(self.executor, _ocr_image, content, self.max_edge, self.timeout)
+            return [await asyncio.wait_for(task, self.timeout)]
+
+        pdf_path = await asyncio.to_thread(_write_temp_pdf, content)
+        try:
+            return await self._extract_pdf_pages(pdf_path)
+        finally:
+            # A page still rendering after the timeout has already been given up on
+            os.unlink(pdf_path)
+
+    async def _extract_pdf_pages(self, pdf_path: str) -> List[Optional[str]]:
+        loop = asyncio.get_running_loop()
+        page_count = await loop.run_in_executor(self.executor, _pdf_page_count, pdf_path, self.timeout)
+        if page_count > self.max_pages:
+            logger.warning(f"PDF has {page_count} pages, only the first {self.max_pages} will be OCR'd")
+            page_count = self.max_pages
+
+        tasks = [
+            loop.run_in_executor(self.executor, _ocr_pdf_page, pdf_path, page, self.dpi, self.max_edge,
+                                 self.timeout)
+            for page in range(1, page_count + 1)
+        ]
+        if not tasks:
+            return []
+
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()  # queued pages never start; running ones hit the worker-side timeout
+        if pending:
+            logger.warning(f"OCR timed out after {self.timeout}s on {len(pending)}/{len(tasks)} page(s)")
+
+        pages = []
+        for task in tasks:
+            if task in done and task.exception() is None:
+                pages.append(task.result())
+            else:
+                if task in done:
+                    logger.warning(f"OCR failed for a PDF page: {task.exception()}")
+                pages.append(None)
+        return pages
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+ocr_engine = OCREngine(
+    max_workers=int(os.getenv("OCR_WORKERS", "0")) or None,
+    dpi=int(os.getenv("OCR_DPI", "200")),
+    max_edge=int(os.getenv("OCR_MAX_EDGE", "2500")),
+    max_pages=int(os.getenv("OCR_MAX_PAGES", "20")),
+    timeout=float(os.getenv("OCR_TIMEOUT", "120")),
+)
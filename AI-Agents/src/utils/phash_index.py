@@ -0,0 +1,159 @@
+# src/utils/phash_index.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from itertools import combinations
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PhashIndex:
+    """Near-duplicate index over 64-bit perceptual hashes (multi-index hashing).
+
+    Each hash is split into `chunks` 16-bit substrings. Two hashes within
+    Hamming distance r must agree within r // chunks bits on at least one
+    substring (pigeonhole), so a query only probes those neighbourhoods and
+    verifies the candidates it finds.
+
+    The substring tables are flat numpy arrays: per chunk, entry numbers
+    sorted by substring value plus the offset where each value starts, so a
+    query probes all neighbourhoods and verifies all candidates in a few
+    vectorized steps. New entries go to an unindexed tail that is scanned
+    directly and folded into the tables once it grows past merge_every.
+
+    Only the hashes and their SQLite rowids are held in memory; claim IDs
+    and URLs stay on disk and are read back for matches only.
+    """
+
+    def __init__(self, path: str, chunks: int = 4, merge_every: int = 4096):
+        self.path = path
+        self.chunks = chunks
+        self.chunk_bits = 64 // chunks
+        self.merge_every = merge_every
+        self._count = 0
+        self._hashes = np.zeros(1024, dtype=np.uint64)  # 64-bit hash per entry
+        self._rowids = np.zeros(1024, dtype=np.int64)  # photo_hashes rowid per entry
+        self._indexed = 0  # entries [0, _indexed) are in the substring tables
+        self._order = np.zeros(0, dtype=np.int64)
+        self._starts = np.zeros((chunks << self.chunk_bits) + 1, dtype=np.int64)
+        self._probe_masks = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS photo_hashes (
+                phash TEXT NOT NULL,
+                claim_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (phash, claim_id, url)
+            )
+        """)
+        self._conn.commit()
+        for rowid, phash in self._conn.execute("SELECT rowid, phash FROM photo_hashes"):
+            self._append(int(phash, 16), rowid)
+        self._rebuild()
+        logger.info(f"Loaded {self._count} photo hashes into duplicate index")
+
+    def _append(self, value: int, rowid: int):
+        if self._count == len(self._hashes):
+            self._hashes = np.resize(self._hashes, 2 * self._count)
+            self._rowids = np.resize(self._rowids, 2 * self._count)
+        self._hashes[self._count] = value
+        self._rowids[self._count] = rowid
+        self._count += 1
+
+    def _chunk_keys(self, hashes: np.ndarray, i: int) -> np.ndarray:
+        mask = np.uint64((1 << self.chunk_bits) - 1)
+        return ((hashes >> np.uint64(i * self.chunk_bits)) & mask).astype(np.int64)
+
+    def _rebuild(self):
+        """Fold every entry into the substring tables"""
+        hashes = self._hashes[:self._count]
+        keys = np.concatenate([self._chunk_keys(hashes, i) + (i << self.chunk_bits) for i in range(self.chunks)])
+        # keys[i * count + entry] belongs to chunk i, so position % count is the entry number
+        self._order = np.argsort(keys, kind="stable") % max(self._count, 1)
+        self._starts[1:] = np.cumsum(np.bincount(keys, minlength=self.chunks << self.chunk_bits))
+        self._indexed = self._count
+
+    def _masks(self, flips: int) -> np.ndarray:
+        """XOR masks flipping up to `flips` bits of one substring"""
+        if flips not in self._probe_masks:
+            self._probe_masks[flips] = np.array(
+                [sum(1 << bit for bit in bits) for n in range(flips + 1) for bits in combinations(range(self.chunk_bits), n)],
+                dtype=np.int64,
+            )
+        return self._probe_masks[flips]
+
+    def add(self, phash: str, claim_id: str, url: str):
+        """Record a photo hash (idempotent per claim/url)"""
+        self.add_many([(phash, claim_id, url)])
+
+    def add_many(self, entries: Iterable[Tuple[str, str, str]]):
+        """Record (phash, claim_id, url) entries in one transaction"""
+        now = time.time()
+        with self._lock:
+            inserted = []
+            with self._conn:
+                for phash, claim_id, url in entries:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO photo_hashes (phash, claim_id, url, created_at) VALUES (?, ?, ?, ?)",
+                        (phash, claim_id, url, now),
+                    )
+                    if cursor.rowcount:
+                        inserted.append((int(phash, 16), cursor.lastrowid))
+            for value, rowid in inserted:
+                self._append(value, rowid)
+            if self._count - self._indexed >= self.merge_every:
+                self._rebuild()
+
+    def query(self, phash: str, radius: int) -> List[dict]:
+        """Return all indexed photos within `radius` bits of phash, closest first"""
+        value = int(phash, 16)
+        target = np.uint64(value)
+        masks = self._masks(radius // self.chunks)
+        with self._lock:
+            # Probe every substring neighbourhood at once
+            probes = np.concatenate([
+                (self._chunk(value, i) ^ masks) + (i << self.chunk_bits) for i in range(self.chunks)
+            ])
+            lo, hi = self._starts[probes], self._starts[probes + 1]
+            lengths = hi - lo
+            total = int(lengths.sum())
+            positions = np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+            candidates = self._order[positions]
+            # ...plus the tail not folded into the tables yet
+            candidates = np.concatenate([candidates, np.arange(self._indexed, self._count)])
+
+            distances = np.bitwise_count(self._hashes[candidates] ^ target)
+            hits = np.unique(candidates[distances <= radius])
+            if not len(hits):
+                return []
+            distances = dict(zip(self._rowids[hits].tolist(), np.bitwise_count(self._hashes[hits] ^ target).tolist()))
+            rows = self._conn.execute(
+                f"SELECT rowid, claim_id, url FROM photo_hashes WHERE rowid IN ({','.join('?' * len(distances))})",
+                tuple(distances),
+            ).fetchall()
+
+        matches = [{"claim_id": claim_id, "url": url, "distance": distances[rowid]} for rowid, claim_id, url in rows]
+        return sorted(matches, key=lambda m: m["distance"])
+
+    def _chunk(self, value: int, i: int) -> int:
+        return (value >> (i * self.chunk_bits)) & ((1 << self.chunk_bits) - 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+phash_index = PhashIndex(
+    path=os.getenv("PHASH_INDEX_PATH", ".cache/phash_index.sqlite3"),
+    merge_every=int(os.getenv("PHASH_INDEX_MERGE_EVERY", "4096")),
+)
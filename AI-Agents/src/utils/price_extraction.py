@@ -0,0 +1,105 @@
+# src/utils/price_extraction.py
+import re
+from collections import Counter
+from typing import List, NamedTuple, Optional
+
+
+class PriceRange(NamedTuple):
+    low: float
+    high: float
+    currency: Optional[str]  # ISO code, None when the snippet gave no currency
+
+
+# Compiled once at import; the search snippets can be large. Text is lowercased
+# before matching, so no IGNORECASE is needed.
+_NUMBER = r"((?:\d{1,3}(?:,\d{2,3})+|\d+)(?:\.\d+)?)"
+_MULTIPLIER = r"(?:\s*(k|thousand|lakhs?|lacs?|crores?))?"
+_SEPARATOR = r"\s*(?:-|–|—|to)\s*"
+# Letter codes need a left boundary, or "repairs 2000-3000" reads as Rs 2000-3000
+_CURRENCY_PREFIX = r"(₹|\$|€|£|(?<![a-z])(?:rs\.?|inr|usd|eur|gbp))"
+_CURRENCY_SUFFIX = r"(rupees|inr|rs\.?|dollars|usd|euros?|eur|pounds|gbp)"
+
+# One pass over the text finds every "<number> - <number>" candidate; the
+# currency in front of the first number is checked separately, which keeps
+# the scan anchored on digits instead of trying every currency at every offset.
+_RANGE_RE = re.compile(
+    rf"(?=\d){_NUMBER}{_MULTIPLIER}{_SEPARATOR}(?:{_CURRENCY_PREFIX}\s*)?{_NUMBER}{_MULTIPLIER}(?:\s*{_CURRENCY_SUFFIX}\b)?"
+)
+_LEADING_CURRENCY_RE = re.compile(rf"{_CURRENCY_PREFIX}\s*$")
+# Characters that mean the number continues a date, phone number, version, etc.
+_JOINED_BEFORE = set("abcdefghijklmnopqrstuvwxyz0123456789_/.:,-")
+_JOINED_AFTER = set("abcdefghijklmnopqrstuvwxyz0123456789_/:-")
+# Units that mean a bare range is not a price ("3-5 days", "10-15 km")
+_NON_PRICE_UNIT_RE = re.compile(
+    r"\s*(?:%|percent|days?|hours?|hrs?|minutes?|mins?|weeks?|months?|years?|yrs?|km|kms|miles?|mm|cm|kg|people|persons?|times)\b"
+)
+
+_CURRENCY_CODES = {
+    "₹": "INR", "rs": "INR", "rs.": "INR", "inr": "INR", "rupees": "INR",
+    "$": "USD", "usd": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pounds": "GBP",
+}
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "crore": 1e7, "crores": 1e7}
+
+MAX_RANGE_RATIO = 20.0  # "500-20000" is a listing of unrelated items, not one price range
+
+
+def _to_amount(number: str, multiplier: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    return value * _MULTIPLIERS.get((multiplier or "").lower(), 1)
+
+
+def _is_plausible(low: float, high: float, bare: bool, low_raw: str, high_raw: str) -> bool:
+    if low <= 0 or high < low or high / low > MAX_RANGE_RATIO:
+        return False
+    if bare:
+        digits = lambda raw: len(raw.replace(",", "").split(".")[0])
+        # Years (2019-2024), phone/ID fragments and tiny counts are not prices
+        if 1900 <= low <= 2100 and 1900 <= high <= 2100:
+            return False
+        if digits(low_raw) > 7 or digits(high_raw) > 7 or low < 10:
+            return False
+    return True
+
+
+def extract_price_ranges(text: str) -> List[PriceRange]:
+    """Extract plausible price ranges from free text (e.g. web search snippets)"""
+    text = text.lower()
+    ranges = []
+
+    for match in _RANGE_RE.finditer(text):
+        low_raw, low_mult, mid_currency, high_raw, high_mult, suffix_currency = match.groups()
+        start, end = match.span()
+
+        leading = _LEADING_CURRENCY_RE.search(text, max(0, start - 6), start)
+        currency = leading.group(1) if leading else (mid_currency or suffix_currency)
+
+        if not leading and start > 0 and text[start - 1] in _JOINED_BEFORE:
+            continue
+        if not suffix_currency and end < len(text) and (
+            text[end] in _JOINED_AFTER or (text[end] == "," and text[end + 1:end + 2].isdigit())
+        ):
+            continue
+        if not currency and _NON_PRICE_UNIT_RE.match(text, end):
+            continue
+
+        low, high = _to_amount(low_raw, low_mult or high_mult), _to_amount(high_raw, high_mult)
+        if _is_plausible(low, high, currency is None, low_raw, high_raw):
+            ranges.append(PriceRange(low, high, _CURRENCY_CODES.get(currency) if currency else None))
+
+    return ranges
+
+
+def market_range(ranges: List[PriceRange]) -> Optional[PriceRange]:
+    """Widest range across the findings in the most common explicit currency.
+
+    Bare ranges are only used when no range carried a currency.
+    """
+    if not ranges:
+        return None
+    tagged = [r for r in ranges if r.currency]
+    if tagged:
+        currency = Counter(r.currency for r in tagged).most_common(1)[0][0]
+        ranges = [r for r in tagged if r.currency == currency]
+    return PriceRange(min(r.low for r in ranges), max(r.high for r in ranges), ranges[0].currency)
@@ -0,0 +1,105 @@
+# src/utils/report_store.py
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from eth_utils import keccak
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_json(obj) -> bytes:
+    """Deterministic encoding, so the same report always hashes to the same leaf"""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def report_leaf(agent_name: str, summary: dict) -> bytes:
+    # Double-hashed like OpenZeppelin's StandardMerkleTree, so a leaf can't pass as an inner node
+    return keccak(keccak(canonical_json({"agent": agent_name, "report": summary})))
+
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    # Sorted pairs: proofs verify with OpenZeppelin MerkleProof.verify on-chain
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    if not leaves:
+        return b"\x00" * 32
+    level = sorted(leaves)
+    while len(level) > 1:
+        level = [_hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+    return level[0]
+
+
+def merkle_proof(leaves: List[bytes], leaf: bytes) -> List[bytes]:
+    """Sibling hashes from leaf up to the root"""
+    level = sorted(leaves)
+    index = level.index(leaf)
+    proof = []
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        level = [_hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    computed = leaf
+    for sibling in proof:
+        computed = _hash_pair(computed, sibling)
+    return computed == root
+
+
+class ReportStore:
+    """Content-addressed store for full agent report bundles kept off-chain.
+
+    Only the Merkle root over the per-agent reports goes on-chain; the bundle
+    is saved under that root, so anyone holding it can recompute and check
+    the on-chain commitment.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, root_hex: str) -> str:
+        return os.path.join(self.directory, f"{root_hex.lower().removeprefix('0x')}.json")
+
+    def put(self, claim_id: str, reports: Dict[str, dict]) -> bytes:
+        """Store the bundle and return its 32-byte Merkle root"""
+        root = merkle_root([report_leaf(agent, summary) for agent, summary in reports.items()])
+        path = self._path(root.hex())
+        with self._lock:
+            if not os.path.exists(path):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(canonical_json({"claim_id": claim_id, "reports": reports}))
+                os.replace(tmp_path, path)
+        logger.info(f"🗂️ Stored agent reports for claim {claim_id} under root 0x{root.hex()}")
+        return root
+
+    def get(self, root_hex: str) -> Optional[dict]:
+        try:
+            with open(self._path(root_hex), "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def verify(self, root_hex: str) -> bool:
+        """Recompute the Merkle root of the stored bundle and compare it to root_hex"""
+        bundle = self.get(root_hex)
+        if bundle is None:
+            return False
+        root = merkle_root([report_leaf(agent, summary) for agent, summary in bundle["reports"].items()])
+        return root.hex() == root_hex.lower().removeprefix("0x")
+
+
+report_store = ReportStore(os.getenv("REPORT_STORE_DIR", ".cache/agent_reports"))
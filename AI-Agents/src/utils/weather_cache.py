@@ -0,0 +1,133 @@
+# src/utils/weather_cache.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherCache:
+    """Persistent two-level cache for the weather tool.
+
+    - location -> (lat, lon, resolved name), expires after geocode_ttl seconds
+    - (lat/lon cell, date) -> daily archive record, kept forever since
+      historical weather never changes
+    """
+
+    def __init__(self, path: str, geocode_ttl: float = 30 * 24 * 3600):
+        self.path = path
+        self.geocode_ttl = geocode_ttl
+        self.geocode_hits = 0
+        self.geocode_misses = 0
+        self.daily_hits = 0
+        self.daily_misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS geocodes (
+                location TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS daily_weather (
+                cell TEXT NOT NULL,
+                date TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (cell, date)
+            );
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def cell(lat: float, lon: float) -> str:
+        """Grid cell (~1 km) used as the archive cache key"""
+        return f"{round(lat, 2):.2f},{round(lon, 2):.2f}"
+
+    @staticmethod
+    def _location_key(location: str) -> str:
+        return " ".join(location.lower().split())
+
+    def get_geocode(self, location: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, latitude, longitude, fetched_at FROM geocodes WHERE location = ?",
+                (self._location_key(location),),
+            ).fetchone()
+        if row is None or time.time() - row[3] > self.geocode_ttl:
+            self.geocode_misses += 1
+            return None
+        self.geocode_hits += 1
+        return {"name": row[0], "latitude": row[1], "longitude": row[2]}
+
+    def put_geocode(self, location: str, name: str, lat: float, lon: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocodes (location, name, latitude, longitude, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (self._location_key(location), name, lat, lon, time.time()),
+            )
+            self._conn.commit()
+
+    def get_daily(self, lat: float, lon: float, date: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM daily_weather WHERE cell = ? AND date = ?",
+                (self.cell(lat, lon), date),
+            ).fetchone()
+        if row is None:
+            self.daily_misses += 1
+            return None
+        self.daily_hits += 1
+        return json.loads(row[0])
+
+    def put_daily(self, lat: float, lon: float, date: str, record: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO daily_weather (cell, date, payload) VALUES (?, ?, ?)",
+                (self.cell(lat, lon), date, json.dumps(record)),
+            )
+            self._conn.commit()
+
+    def put_daily_many(self, lat: float, lon: float, records: dict):
+        """Store {date: record} for one cell in a single transaction"""
+        cell = self.cell(lat, lon)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO daily_weather (cell, date, payload) VALUES (?, ?, ?)",
+                [(cell, day, json.dumps(record)) for day, record in records.items()],
+            )
+
+    def cached_dates(self, lat: float, lon: float, dates: list) -> set:
+        """Which of the given dates are already stored for this cell (not counted in stats)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT date FROM daily_weather WHERE cell = ? AND date IN ({','.join('?' * len(dates))})",
+                (self.cell(lat, lon), *dates),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def stats(self) -> dict:
+        geocode_lookups = self.geocode_hits + self.geocode_misses
+        daily_lookups = self.daily_hits + self.daily_misses
+        return {
+            "geocode_hits": self.geocode_hits,
+            "geocode_misses": self.geocode_misses,
+            "geocode_hit_rate": round(self.geocode_hits / geocode_lookups, 3) if geocode_lookups else 0.0,
+            "daily_hits": self.daily_hits,
+            "daily_misses": self.daily_misses,
+            "daily_hit_rate": round(self.daily_hits / daily_lookups, 3) if daily_lookups else 0.0,
+        }
+
+
+weather_cache = WeatherCache(
+    path=os.getenv("WEATHER_CACHE_PATH", ".cache/weather_cache.sqlite3"),
+    geocode_ttl=float(os.getenv("WEATHER_GEOCODE_TTL", str(30 * 24 * 3600))),
+)
@@ -2,10 +2,11 @@ import asyncio
 from typing import Dict, Any, List
 from datetime import datetime
 import logging
+import os
 
 # CHANGE 1: Import StateGraph and define the state schema
-from langgraph.graph import StateGraph
-from typing import TypedDict, List
+from langgraph.graph import StateGraph, START, END
+from typing import TypedDict, List, Annotated
 
 from langsmith import traceable
 from ..agents.document_agent import DocumentAgent
@@ -14,10 +15,18 @@ from ..agents.fraud_agent import FraudAgent
 from ..agents.settlement_agent import SettlementAgent
 from ..agents.blockchain_agent import BlockchainAgent
 from ..models.claim_models import AIAssessmentResult, AgentReport
+from ..utils.chain_outbox import chain_outbox
 
 logger = logging.getLogger(__name__)
 
 
+def merge_agent_reports(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for agent_reports: merge per-agent entries written by parallel branches"""
+    merged = dict(current or {})
+    merged.update(update or {})
+    return merged
+
+
 # This TypedDict defines the structure of our application's state.
 # All nodes in the graph will read from and write to this state.
 class AgentState(TypedDict):
@@ -30,7 +39,8 @@ class AgentState(TypedDict):
     damage_photo_urls: List[str]
     incident_date: str
     location: str
-    agent_reports: Dict[str, Any]
+    # Document and damage nodes run concurrently, so reports are merged by reducer
+    agent_reports: Annotated[Dict[str, Any], merge_agent_reports]
     fraud_detected: bool
     risk_score: int
     recommended_amount: float
@@ -45,6 +55,9 @@ class ClaimProcessingWorkflow:
         self.fraud_agent = FraudAgent()
         self.settlement_agent = SettlementAgent()
         self.blockchain_agent = BlockchainAgent()
+        # When set, the blockchain step only queues the write in the durable outbox
+        # and a background worker anchors it, so the response doesn't wait on confirmations
+        self.async_anchoring = os.getenv("CHAIN_ANCHOR_ASYNC", "false").lower() == "true"
         self.graph = self._build_workflow()
 
     def _build_workflow(self) -> StateGraph:
@@ -55,56 +68,80 @@ class ClaimProcessingWorkflow:
         workflow.add_node("damage_assessment", self._damage_assessment_node)
         workflow.add_node("fraud_detection", self._fraud_detection_node)
         workflow.add_node("settlement_calculation", self._settlement_calculation_node)
-        workflow.add_node("blockchain_update", self._blockchain_update_node)
-
-        workflow.add_edge("document_analysis", "damage_assessment")
-        workflow.add_edge("damage_assessment", "fraud_detection")
+        workflow.add_node(
+            "blockchain_update",
+            self._queue_blockchain_update_node if self.async_anchoring else self._blockchain_update_node,
+        )
+
+        # Document and damage analysis only read raw claim fields, so they fan out
+        # from START in parallel and join before fraud detection.
+        workflow.add_edge(START, "document_analysis")
+        workflow.add_edge(START, "damage_assessment")
+        workflow.add_edge(["document_analysis", "damage_assessment"], "fraud_detection")
         workflow.add_edge("fraud_detection", "settlement_calculation")
         workflow.add_edge("settlement_calculation", "blockchain_update")
-
-        workflow.set_entry_point("document_analysis")
-        # The 'END' node is implicitly the last node in a linear chain
-        workflow.add_edge("blockchain_update", "__end__")
+        workflow.add_edge("blockchain_update", END)
         
         return workflow.compile()
 
-    async def _document_analysis_node(self, state: AgentState) -> AgentState:
+    async def _document_analysis_node(self, state: AgentState) -> dict:
         logger.info(f"Processing document analysis for claim {state['claim_id']}")
         report = await self.document_agent.process(state)
-        state['agent_reports']['document_agent'] = report
-        return state
+        # Return only the keys this node writes; the reducer merges agent_reports
+        return {"agent_reports": {"document_agent": report}}
 
-    async def _damage_assessment_node(self, state: AgentState) -> AgentState:
+    async def _damage_assessment_node(self, state: AgentState) -> dict:
         logger.info(f"Processing damage assessment for claim {state['claim_id']}")
         report = await self.damage_agent.process(state)
-        state['agent_reports']['damage_agent'] = report
-        return state
+        return {"agent_reports": {"damage_agent": report}}
 
-    async def _fraud_detection_node(self, state: AgentState) -> AgentState:
+    async def _fraud_detection_node(self, state: AgentState) -> dict:
         logger.info(f"Processing fraud detection for claim {state['claim_id']}")
         report = await self.fraud_agent.process(state)
-        state['agent_reports']['fraud_agent'] = report
-        state['fraud_detected'] = report['findings'].get('fraud_detected', False)
-        state['risk_score'] = report['findings'].get('risk_score', 0)
-        return state
+        return {
+            "agent_reports": {"fraud_agent": report},
+            "fraud_detected": report['findings'].get('fraud_detected', False),
+            "risk_score": report['findings'].get('risk_score', 0),
+        }
 
-    async def _settlement_calculation_node(self, state: AgentState) -> AgentState:
+    async def _settlement_calculation_node(self, state: AgentState) -> dict:
         logger.info(f"Processing settlement for claim {state['claim_id']}")
         report = await self.settlement_agent.process(state)
-        state['agent_reports']['settlement_agent'] = report
-        state['recommended_amount'] = report['findings'].get('recommended_amount', 0)
-        return state
+        return {
+            "agent_reports": {"settlement_agent": report},
+            "recommended_amount": report['findings'].get('recommended_amount', 0),
+        }
 
-    async def _blockchain_update_node(self, state: AgentState) -> AgentState:
-        logger.info(f"Updating blockchain for claim {state['claim_id']}")
+    @staticmethod
+    def _confidence_score(state: AgentState) -> float:
         # Calculate final confidence score before sending to blockchain
         confidences = [r['confidence'] for r in state['agent_reports'].values() if r and 'confidence' in r]
-        state['confidence_score'] = sum(confidences) / len(confidences) if confidences else 0
+        return sum(confidences) / len(confidences) if confidences else 0
+
+    async def _queue_blockchain_update_node(self, state: AgentState) -> dict:
+        logger.info(f"Queueing blockchain update for claim {state['claim_id']}")
+        confidence_score = self._confidence_score(state)
         
-        report = await self.blockchain_agent.process(state)
-        state['agent_reports']['blockchain_agent'] = report
-        state['tx_hash'] = report['findings'].get('tx_hash')
-        return state
+        queued = await asyncio.to_thread(chain_outbox.enqueue, state["claim_id"], {**state, "confidence_score": confidence_score})
+        step = "⏳ Queued for on-chain anchoring" if queued else "⏳ Already in the chain outbox - see chain-status"
+        report = self.blockchain_agent._create_agent_report(
+            0.5, {"status": "queued", "steps": [step], "tx_hash": None}, 0
+        )
+        return {
+            "agent_reports": {"blockchain_agent": report},
+            "confidence_score": confidence_score,
+        }
+
+    async def _blockchain_update_node(self, state: AgentState) -> dict:
+        logger.info(f"Updating blockchain for claim {state['claim_id']}")
+        confidence_score = self._confidence_score(state)
+        
+        report = await self.blockchain_agent.process({**state, "confidence_score": confidence_score})
+        return {
+            "agent_reports": {"blockchain_agent": report},
+            "confidence_score": confidence_score,
+            "tx_hash": report['findings'].get('tx_hash'),
+        }
 
     @traceable
     async def process_claim(self, request: dict) -> AIAssessmentResult:
@@ -119,6 +156,7 @@ class ClaimProcessingWorkflow:
             "damage_photo_urls": request.get("damage_photo_urls", []),
             "incident_date": request.get("incident_date"),
             "location": request.get("location"),
+            "user_id": request.get("user_id"),
             "agent_reports": {},
             "fraud_detected": False,
             "risk_score": 0,
@@ -154,6 +192,9 @@ class ClaimProcessingWorkflow:
                     top_flags = red_flags[:2]  # Show top 2 flags
                     fraud_reason += ". Key issues: " + "; ".join(top_flags)
 
+            # "queued" when anchoring runs through the outbox; poll /claims/{id}/chain-status for the tx hash
+            chain_findings = final_state.get("agent_reports", {}).get("blockchain_agent", {}).get("findings", {})
+
             return AIAssessmentResult(
                 claim_id=final_state["claim_id"],
                 confidence_score=final_state.get("confidence_score", 0) * 100,
@@ -164,7 +205,7 @@ class ClaimProcessingWorkflow:
                 requires_human_review=requires_human_review,
                 agent_reports=final_state.get("agent_reports", {}),
                 processing_time=processing_time,
-                metadata={"tx_hash": final_state.get("tx_hash")}
+                metadata={"tx_hash": final_state.get("tx_hash"), "chain_status": chain_findings.get("status")}
             )
         except Exception as e:
             logger.error(f"Workflow failed for claim {request['claim_id']}: {str(e)}")
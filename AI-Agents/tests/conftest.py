@@ -0,0 +1,61 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+import httpx
+import pytest
+
+from helpers import FakeChain, Upstream, WeatherServer
+
+# Module-level singletons open their SQLite files at import; keep them out of
+# the working tree's .cache/ while the suite runs.
+_cache_dir = tempfile.mkdtemp(prefix="ai-agents-tests-")
+for _name, _file in (
+    ("OCR_CACHE_PATH", "ocr_cache.sqlite3"),
+    ("PHASH_INDEX_PATH", "phash_index.sqlite3"),
+    ("CHAIN_OUTBOX_PATH", "chain_outbox.sqlite3"),
+    ("WEATHER_CACHE_PATH", "weather_cache.sqlite3"),
+    ("REPORT_STORE_DIR", "agent_reports"),
+):
+    os.environ.setdefault(_name, os.path.join(_cache_dir, _file))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route the shared HTTP and AsyncOpenAI clients to an Upstream"""
+    from openai import AsyncOpenAI
+
+    from src.utils import clients
+
+    server = Upstream()
+    transport = httpx.MockTransport(server.handler)
+    monkeypatch.setattr(clients, "_http_client", httpx.AsyncClient(transport=transport))
+    monkeypatch.setattr(clients, "_openai_client", AsyncOpenAI(
+        api_key="test", base_url="https://api.openai.test/v1", http_client=httpx.AsyncClient(transport=transport),
+    ))
+    return server
+
+
+@pytest.fixture
+def weather_server(monkeypatch, tmp_path):
+    """Route the shared HTTP client to a WeatherServer, with an empty weather cache"""
+    from src.tools import weather_tool
+    from src.utils import clients
+    from src.utils.weather_cache import WeatherCache
+
+    server = WeatherServer()
+    monkeypatch.setattr(clients, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(server.handler)))
+    monkeypatch.setattr(weather_tool, "weather_cache", WeatherCache(str(tmp_path / "weather.sqlite3")))
+    return server
+
+
+@pytest.fixture
+async def chain():
+    """A FakeChain JSON-RPC node mining a block every 50ms"""
+    node = FakeChain()
+    node.start()
+    yield node
+    node.stop()
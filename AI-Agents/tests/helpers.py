@@ -0,0 +1,237 @@
+# tests/helpers.py
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import httpx
+import rlp
+from eth_abi import encode
+from eth_utils import keccak
+from PIL import Image
+from web3.providers.async_base import AsyncBaseProvider
+
+
+def photo_bytes(color=(200, 40, 40), size=(64, 48)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class Upstream:
+    """Slow fake image host + OpenAI endpoint on an httpx mock transport.
+
+    Photos are served for any URL (photos(url) picks the bytes); chat
+    completions answer with vision_reply(images), where images are the
+    decoded PIL images in the request. Records how many requests overlap.
+    """
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self.requests = 0
+        self.release = None  # optional asyncio.Event gating every request
+        self.photos = lambda url: photo_bytes()
+        self.vision_reply = lambda images: "dent on bumper"
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.release is not None:
+                await self.release.wait()
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        if request.url.host == "api.openai.test":
+            content = json.loads(request.content)["messages"][-1]["content"]
+            images = [
+                Image.open(BytesIO(base64.b64decode(part["image_url"]["url"].split(",", 1)[1])))
+                for part in content if part["type"] == "image_url"
+            ]
+            return httpx.Response(200, json={
+                "id": "c", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": self.vision_reply(images)}}],
+            })
+        return httpx.Response(200, content=self.photos(str(request.url)), headers={"Content-Type": "image/jpeg"})
+
+
+CITIES = {"Pune": (18.52, 73.86), "Mumbai": (19.08, 72.88), "Nagpur": (21.15, 79.09), "Nashik": (20.0, 73.79)}
+
+
+class WeatherServer:
+    """Fake Open-Meteo geocoding + archive API with a fixed latency per request"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.geocode_requests = 0
+        self.archive_requests = 0
+        self.active = 0
+        self.peak = 0
+        self.fail_archive = False
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        params = request.url.params
+        if request.url.path == "/v1/search":
+            self.geocode_requests += 1
+            coords = CITIES.get(params["name"])
+            results = [{"latitude": coords[0], "longitude": coords[1]}] if coords else []
+            return httpx.Response(200, json={"results": results})
+
+        self.archive_requests += 1
+        if self.fail_archive:
+            return httpx.Response(429, json={"reason": "Too many requests"})
+        start = datetime.strptime(params["start_date"], "%Y-%m-%d")
+        end = datetime.strptime(params["end_date"], "%Y-%m-%d")
+        days = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+        return httpx.Response(200, json={"daily": {
+            "time": days,
+            "weather_code": [61] * len(days),
+            "precipitation_sum": [12.5] * len(days),
+            "wind_speed_10m_max": [20.0] * len(days),
+        }})
+
+
+CHAIN_ID = 80002
+CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+CLAIMS_OUTPUTS = ["uint256", "address", "uint8", "uint8", "uint256", "uint256", "string", "uint256", "bool"]
+
+
+class RPCError(Exception):
+    """Raised by a FakeChain handler to answer with a JSON-RPC error"""
+
+
+class FakeChain(AsyncBaseProvider):
+    """In-memory JSON-RPC node for AsyncWeb3: a mempool, nonce-ordered mining and receipts.
+
+    mine_block() mines the pending transactions in nonce order; start() does
+    so every block_time. drop_nonces lists nonces whose first broadcast is
+    accepted but silently lost, like a transaction evicted from a busy
+    mempool. Handlers are the _<method> attributes, so a test can replace
+    one; exceptions other than RPCError reach the caller as transport errors.
+    """
+
+    def __init__(self, block_time: float = 0.05, latency: float = 0.002, drop_nonces=()):
+        super().__init__()
+        self.block_time = block_time
+        self.latency = latency
+        self.code = b"\x60\x80"  # tests append the selectors of the deployed functions
+        self.block = 1
+        self.latest = 0  # next nonce to mine
+        self.pool = {}  # nonce -> tx hash
+        self.receipts = {}  # tx hash -> receipt
+        self.sent = []  # (nonce, selector) in broadcast order
+        self.hashes_seen = set()
+        self.drop_nonces = set(drop_nonces)
+        self.calls = {}
+        self.sends_in_flight = 0
+        self.peak_sends_in_flight = 0
+        self.mining = True
+        self._miner = None
+
+    def start(self):
+        self._miner = asyncio.create_task(self._mine())
+
+    def stop(self):
+        self._miner.cancel()
+
+    async def _mine(self):
+        while True:
+            await asyncio.sleep(self.block_time)
+            if self.mining:
+                self.mine_block()
+
+    def mine_block(self):
+        self.block += 1
+        while self.latest in self.pool:
+            tx_hash = self.pool.pop(self.latest)
+            self.receipts[tx_hash] = {
+                "transactionHash": tx_hash, "blockNumber": hex(self.block), "blockHash": "0x" + "11" * 32,
+                "transactionIndex": "0x0", "status": "0x1", "gasUsed": hex(90000),
+                "cumulativeGasUsed": hex(90000), "logs": [], "contractAddress": None, "type": "0x0",
+                "from": "0x" + "00" * 20, "to": CONTRACT, "effectiveGasPrice": hex(30 * 10**9),
+                "logsBloom": "0x" + "00" * 256,
+            }
+            self.latest += 1
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    async def make_request(self, method, params):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        await asyncio.sleep(self.latency)
+        handler = getattr(self, f"_{method}", None)
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32601, "message": f"{method} not supported"}}
+        try:
+            result = handler(*params)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except RPCError as e:
+            return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+    def _eth_chainId(self):
+        return hex(CHAIN_ID)
+
+    def _eth_blockNumber(self):
+        return hex(self.block)
+
+    def _eth_getCode(self, address, block):
+        return "0x" + self.code.hex()
+
+    def _eth_call(self, tx, block):
+        # Only claims(uint256) is read by BlockchainAgent.process(): every ID is free
+        assert tx["data"].startswith("0x" + keccak(text="claims(uint256)")[:4].hex())
+        return "0x" + encode(CLAIMS_OUTPUTS, [0, "0x" + "00" * 20, 0, 0, 0, 0, "", 0, False]).hex()
+
+    def _eth_estimateGas(self, tx, *block):
+        return hex(80000)
+
+    def _eth_getTransactionCount(self, address, block):
+        if block == "latest":
+            return hex(self.latest)
+        nonce = self.latest
+        while nonce in self.pool:
+            nonce += 1
+        return hex(nonce)
+
+    async def _eth_sendRawTransaction(self, raw):
+        self.sends_in_flight += 1
+        self.peak_sends_in_flight = max(self.peak_sends_in_flight, self.sends_in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.sends_in_flight -= 1
+        nonce, tx_hash, selector = decode_raw_tx(raw)
+        if nonce < self.latest:
+            raise RPCError("nonce too low")
+        if tx_hash in self.receipts or self.pool.get(nonce) == tx_hash:
+            raise RPCError("already known")
+        self.sent.append((nonce, selector))
+        self.hashes_seen.add(tx_hash)
+        if nonce in self.drop_nonces:
+            self.drop_nonces.discard(nonce)
+        else:
+            self.pool[nonce] = tx_hash
+        return tx_hash
+
+    def _eth_getTransactionReceipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+
+def decode_raw_tx(raw: str):
+    """(nonce, tx hash, function selector) of a legacy (EIP-155) signed transaction"""
+    raw = bytes.fromhex(raw.removeprefix("0x"))
+    fields = rlp.decode(raw)
+    return int.from_bytes(fields[0], "big"), "0x" + keccak(raw).hex(), bytes(fields[5][:4])
@@ -0,0 +1,103 @@
+# tests/test_artifact_store.py
+import asyncio
+import base64
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from src.agents.base_agent import BaseAgent
+from src.utils.artifact_store import Artifact, ArtifactStore
+
+class VisionAgent(BaseAgent):
+    async def process(self, claim_data: dict) -> dict:
+        started = time.perf_counter()
+        analysis = await self._analyze_images_with_vision(claim_data["photos"], "Describe the damage")
+        return self._create_agent_report(0.9, {"analysis": analysis}, time.perf_counter() - started)
+
+
+async def test_concurrent_claims_overlap_instead_of_serializing(upstream):
+    agent = VisionAgent("Vision Test")
+    claims = [{"photos": [f"https://img.test/claim-{i}.jpg"]} for i in range(8)]
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    heartbeat = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    reports = await asyncio.gather(*(agent.process(claim) for claim in claims))
+    elapsed = time.perf_counter() - started
+    heartbeat.cancel()
+
+    assert all(r["findings"]["analysis"] == "dent on bumper" for r in reports)
+    # Each claim is one download + one vision call; serialized that is 8 * 2 * latency
+    assert elapsed < 4 * upstream.latency
+    assert upstream.peak == len(claims)
+    assert ticks >= elapsed / 0.01 * 0.5  # the event loop kept running throughout
+
+
+async def test_concurrent_gets_share_one_download(upstream):
+    store = ArtifactStore()
+    artifacts = await asyncio.gather(*(store.get("https://img.test/a.jpg") for _ in range(5)))
+    assert upstream.requests == 1
+    assert all(a is artifacts[0] for a in artifacts)
+    assert store.stats()["hits"] == 4
+
+
+async def test_cancelled_download_does_not_strand_waiters(upstream):
+    upstream.release = asyncio.Event()
+    store = ArtifactStore()
+    owner = asyncio.create_task(store.get("https://img.test/b.jpg"))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(store.get("https://img.test/b.jpg"))
+    await asyncio.sleep(0.01)
+
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    upstream.release.set()
+
+    artifact = await asyncio.wait_for(waiter, timeout=2)
+    assert artifact.content[:2] == b"\xff\xd8"
+    assert not store._inflight
+
+
+def _phone_photo() -> bytes:
+    """Landscape sensor image tagged 'rotate 90° CW' (orientation 6) with a GPS position"""
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x8825] = {1: "N", 2: (19.0, 4.0, 0.0), 3: "E", 4: (72.0, 52.0, 0.0)}
+    buffer = BytesIO()
+    Image.new("RGB", (80, 40), (10, 120, 200)).save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def _decode(payload: dict) -> Image.Image:
+    return Image.open(BytesIO(base64.b64decode(payload["base64"])))
+
+
+def test_vision_payload_applies_orientation_and_strips_metadata():
+    original = _phone_photo()
+    assert Image.open(BytesIO(original)).getexif()  # the source does carry EXIF/GPS
+
+    payload = Artifact("https://img.test/phone.jpg", original).vision_payload(max_edge=1536)
+    sent = _decode(payload)
+    assert sent.size == (40, 80)  # rotated upright rather than relying on the dropped tag
+    assert not sent.getexif()
+    assert "exif" not in sent.info and "icc_profile" not in sent.info
+
+
+def test_vision_payload_never_falls_back_to_original_bytes():
+    # A tiny, flat PNG re-encodes larger as JPEG; it must still be the stripped encoding
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), (0, 0, 0)).save(buffer, format="PNG")
+    payload = Artifact("https://img.test/tiny.png", buffer.getvalue()).vision_payload(max_edge=1536)
+    assert payload["mime_type"] == "image/jpeg"
+    assert _decode(payload).format == "JPEG"
+    assert payload["bytes_saved"] < 0
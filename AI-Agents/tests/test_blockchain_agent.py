@@ -0,0 +1,96 @@
+# tests/test_blockchain_agent.py
+# BlockchainAgent end to end on a real AsyncWeb3 whose provider is an
+# in-memory JSON-RPC node: contract reads, gas estimation, signing, broadcast
+# and receipt polling all go through web3's async request pipeline.
+import asyncio
+
+from eth_account import Account
+from eth_utils import keccak
+from web3 import AsyncWeb3
+
+from helpers import CONTRACT
+from src.agents.blockchain_agent import BlockchainAgent
+from src.utils.nonce_manager import NonceManager
+
+
+def _selector(abi: list, name: str) -> bytes:
+    function = next(f for f in abi if f.get("name") == name)
+    return keccak(text=f"{name}({','.join(i['type'] for i in function['inputs'])})")[:4]
+
+
+CLAIM = {
+    "claim_id": "claim-1",
+    "claim_type": "auto",
+    "requested_amount": 700,
+    "recommended_amount": 600,
+    "confidence_score": 0.85,
+    "risk_score": 20,
+    "fraud_detected": False,
+    "agent_reports": {"fraud_agent": {"confidence": 0.8, "findings": {"risk_score": 20}}},
+}
+
+
+def _agent(monkeypatch, node, deployed=("submitClaimWithAssessment",)) -> BlockchainAgent:
+    monkeypatch.setenv("PRIVATE_KEY", Account.create().key.hex())
+    monkeypatch.setenv("CONTRACT_ADDRESS", CONTRACT)
+    monkeypatch.setenv("CHAIN_RECEIPT_POLL_INTERVAL", "0.02")
+    agent = BlockchainAgent()
+    agent.w3 = AsyncWeb3(node)
+    agent.nonces = NonceManager(agent.w3, agent.account.address)
+    node.code += b"".join(_selector(agent.contract_abi, name) for name in deployed)
+    return agent
+
+
+async def test_claim_is_anchored_through_async_web3(chain, monkeypatch):
+    agent = _agent(monkeypatch, chain)
+    chain.mining = False
+    task = asyncio.create_task(agent.process(dict(CLAIM)))
+    # The event loop stays free while the agent polls for the receipt
+    while chain.calls.get("eth_getTransactionReceipt", 0) < 3:
+        await asyncio.sleep(0.01)
+    assert not task.done()
+    chain.mining = True
+    report = await task
+
+    findings = report["findings"]
+    assert findings["status"] == "success", findings
+    assert findings["submission_mode"] == "combined"
+    assert findings["tx_hash"] == chain.receipts[next(iter(chain.receipts))]["transactionHash"].removeprefix("0x")
+    assert findings["gas_used"] == 90000
+    assert agent.nonces.stats()["unconfirmed"] == 0
+
+
+async def test_concurrent_claims_share_block_confirmations(chain, monkeypatch):
+    agent = _agent(monkeypatch, chain)
+    claims = [{**CLAIM, "claim_id": f"claim-{i}"} for i in range(6)]
+
+    reports = await asyncio.gather(*(agent.process(claim) for claim in claims))
+
+    assert [r["findings"]["status"] for r in reports] == ["success"] * len(claims)
+    assert sorted(nonce for nonce, _ in chain.sent) == list(range(len(claims)))
+    # The six waits overlap, so blocks carry several claims instead of one each
+    assert len({receipt["blockNumber"] for receipt in chain.receipts.values()}) < len(claims)
+
+
+async def test_older_contract_uses_pipelined_two_step_path(chain, monkeypatch):
+    agent = _agent(monkeypatch, chain, deployed=())
+    report = await agent.process(dict(CLAIM))
+
+    findings = report["findings"]
+    assert findings["status"] == "success", findings
+    assert findings["submission_mode"] == "two_step"
+    assert chain.sent == [(0, _selector(agent.contract_abi, "submitClaim")),
+                          (1, _selector(agent.contract_abi, "updateAIAssessment"))]
+    assert findings["gas_used"] == 2 * 90000
+
+
+async def test_receipt_timeout_reports_an_error_without_blocking(chain, monkeypatch):
+    chain.mining = False
+    monkeypatch.setenv("CHAIN_RECEIPT_TIMEOUT", "0.3")
+    agent = _agent(monkeypatch, chain)
+
+    report = await agent.process(dict(CLAIM))
+
+    assert report["findings"]["status"] == "error"
+    assert "not in the chain" in report["findings"]["error"]
+    assert chain.calls["eth_getTransactionCount"] >= 3  # recover() re-read latest and pending
@@ -0,0 +1,89 @@
+# tests/test_chain_gas.py
+# ESTIMATES, not measurements. These compute the intrinsic gas (21000 base + calldata)
+# of the calldata BlockchainAgent actually builds, plus a slot-count guess for report
+# storage. Nothing here runs the EVM, calls eth_estimateGas or reads a receipt, so the
+# numbers cannot stand in for measured gasUsed. `npm run gas` in Block/ measures the
+# full cost on a Hardhat network.
+import pytest
+from eth_account import Account
+from web3 import Web3
+
+from src.agents.blockchain_agent import BlockchainAgent
+
+CLAIM = {
+    "claim_id": "8f14e45f-ceea-467f-a8c8-1f2b1b7d5c0e",
+    "claim_type": "auto",
+    "requested_amount": 700,
+    "recommended_amount": 600,
+    "confidence_score": 0.85,
+    "risk_score": 20,
+    "fraud_detected": False,
+    "agent_reports": {
+        "document_agent": {"confidence": 0.9, "findings": {"validity": "valid"}},
+        "damage_agent": {"confidence": 0.85, "findings": {"estimated_cost": 650}},
+        "fraud_agent": {"confidence": 0.8, "findings": {"risk_score": 20, "reason": "No significant risk factors"}},
+        "settlement_agent": {"confidence": 0.9, "findings": {"recommended_amount": 600}},
+    },
+}
+
+
+def intrinsic_gas(calldata: str) -> int:
+    data = bytes.fromhex(calldata.removeprefix("0x"))
+    return 21000 + sum(16 if byte else 4 for byte in data)
+
+
+@pytest.fixture(scope="module")
+def agent():
+    agent = BlockchainAgent()
+    agent.account = Account.create()
+    agent.contract = Web3().eth.contract(abi=agent.contract_abi)
+    return agent
+
+
+def _calldata(agent, function, *args) -> str:
+    return agent.contract.encode_abi(function, args=list(args))
+
+
+def test_estimated_intrinsic_gas_of_combined_submission(agent):
+    blockchain_id = agent._get_blockchain_claim_id(CLAIM["claim_id"])
+    claim = agent._claim_args(CLAIM, blockchain_id)
+    assessment = agent._assessment_args(CLAIM, agent._encode_reports(CLAIM, "inline"))
+
+    two_step = (intrinsic_gas(_calldata(agent, "submitClaim", *claim))
+                + intrinsic_gas(_calldata(agent, "updateAIAssessment", blockchain_id, *assessment)))
+    combined = intrinsic_gas(_calldata(agent, "submitClaimWithAssessment", *claim, *assessment))
+
+    print(f"\nESTIMATE, intrinsic gas only: submitClaim + updateAIAssessment {two_step}, submitClaimWithAssessment {combined} "
+          f"({combined - two_step:+d})")
+    # One 21000 base fee and the repeated claim ID / selector words disappear
+    assert two_step - combined > 21000
+
+
+def _storage_slots(reports) -> int:
+    """Slots written for a string[] in storage: the length, then per string its
+    length slot (short strings fit in it) plus one slot per 32 bytes"""
+    slots = 1
+    for report in reports:
+        size = len(report.encode("utf-8"))
+        slots += 1 if size < 32 else 1 + -(-size // 32)
+    return slots
+
+
+def test_estimated_gas_of_root_commitment_vs_inline_reports(agent):
+    blockchain_id = agent._get_blockchain_claim_id(CLAIM["claim_id"])
+    inline = agent._encode_reports(CLAIM, "inline")
+    root = agent._encode_reports(CLAIM, "hash")
+
+    inline_calldata = intrinsic_gas(_calldata(agent, "updateAIAssessment", blockchain_id,
+                                              *agent._assessment_args(CLAIM, inline)))
+    root_calldata = intrinsic_gas(_calldata(agent, "updateAIAssessmentRoot", blockchain_id,
+                                            *agent._assessment_args(CLAIM, root)))
+    # A fresh storage slot costs 22,100 gas (20,000 SSTORE + 2,100 cold access)
+    inline_storage = _storage_slots(inline) * 22100
+    root_storage = 1 * 22100
+
+    print(f"\nESTIMATE (intrinsic calldata gas + storage slot guess)\nupdateAIAssessment: calldata {inline_calldata}, report storage ~{inline_storage} "
+          f"({_storage_slots(inline)} slots)\nupdateAIAssessmentRoot: calldata {root_calldata}, "
+          f"report storage ~{root_storage} (1 slot)")
+    assert root_calldata < inline_calldata
+    assert root_storage * 10 < inline_storage
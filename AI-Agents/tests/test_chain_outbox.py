@@ -0,0 +1,162 @@
+# tests/test_chain_outbox.py
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from web3.exceptions import TransactionNotFound
+
+from src.agents.blockchain_agent import BlockchainAgent
+from src.utils.chain_outbox import ANCHORED, IN_PROGRESS, PENDING, ChainOutbox, run_outbox_worker
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return ChainOutbox(str(tmp_path / "outbox.sqlite3"), retry_base_delay=0)
+
+
+def test_enqueue_never_resets_an_anchored_row(outbox):
+    outbox.enqueue("c1", {"v": 1})
+    job = outbox.take_next()
+    outbox.mark_anchored("c1", job.lease, "0xabc", 42)
+
+    assert outbox.enqueue("c1", {"v": "dummy"}) is False
+    row = outbox.get("c1")
+    assert (row["status"], row["tx_hash"], row["blockchain_claim_id"]) == (ANCHORED, "0xabc", 42)
+    assert outbox.take_next() is None
+
+
+def test_enqueue_refreshes_a_pending_payload(outbox):
+    outbox.enqueue("c1", {"v": 1})
+    assert outbox.enqueue("c1", {"v": 2}) is True
+    assert outbox.take_next().state == {"v": 2}
+
+
+def test_in_progress_row_is_not_re_queued(outbox):
+    outbox.enqueue("c1", {"v": 1})
+    outbox.take_next()
+    assert outbox.enqueue("c1", {"v": 2}) is False
+    assert outbox.get("c1")["status"] == IN_PROGRESS
+
+
+def test_each_row_is_leased_once_across_connections(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    writers = [ChainOutbox(path) for _ in range(4)]  # one connection per "process"
+    for i in range(100):
+        writers[0].enqueue(f"c{i}", {"i": i})
+
+    taken, lock = [], threading.Lock()
+
+    def drain(box):
+        while (job := box.take_next()) is not None:
+            with lock:
+                taken.append(job.claim_id)
+
+    threads = [threading.Thread(target=drain, args=(box,)) for box in writers for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(taken) == sorted(f"c{i}" for i in range(100))
+
+
+def test_expired_lease_is_reclaimed_and_stale_owner_is_ignored(tmp_path):
+    box = ChainOutbox(str(tmp_path / "o.sqlite3"), lease_seconds=-1)
+    box.enqueue("c1", {})
+    first = box.take_next()
+    second = box.take_next()  # lease already expired
+    assert second.claim_id == "c1" and second.attempts == 2
+
+    assert box.record_attempt("c1", first.lease, 7, "0xold") is False
+    box.mark_anchored("c1", first.lease, "0xold", 7)
+    assert box.get("c1")["status"] == IN_PROGRESS
+
+    box.mark_anchored("c1", second.lease, "0xnew", 7)
+    assert box.get("c1")["status"] == ANCHORED
+
+
+async def test_retry_receives_the_checkpointed_attempt(outbox):
+    outbox.enqueue("c1", {"claim_id": "c1"})
+    calls = []
+
+    async def anchor(state, previous_attempt=None, checkpoint=None):
+        calls.append(previous_attempt)
+        if len(calls) == 1:
+            await checkpoint(1234)
+            await checkpoint(1234, "0xfeed")  # signed, then the broadcast/receipt wait failed
+            raise TimeoutError("receipt timeout")
+        return {"findings": {"status": "success", "tx_hash": previous_attempt["tx_hash"],
+                             "blockchain_claim_id": previous_attempt["blockchain_claim_id"]}}
+
+    worker = asyncio.create_task(run_outbox_worker(outbox, anchor, poll_interval=0.01))
+    for _ in range(200):
+        if outbox.get("c1")["status"] == ANCHORED:
+            break
+        await asyncio.sleep(0.01)
+    worker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+
+    assert calls == [None, {"tx_hash": "0xfeed", "blockchain_claim_id": 1234}]
+    assert outbox.get("c1")["status"] == ANCHORED
+
+
+async def test_worker_keeps_sqlite_off_the_event_loop_and_releases_its_lease(outbox):
+    outbox.enqueue("c1", {"claim_id": "c1"})
+    threads = set()
+    for name in ("take_next", "record_attempt", "mark_failed"):
+        method = getattr(outbox, name)
+
+        def recorded(*args, _method=method):
+            threads.add(threading.current_thread())
+            return _method(*args)
+        setattr(outbox, name, recorded)
+    started = asyncio.Event()
+
+    async def anchor(state, previous_attempt=None, checkpoint=None):
+        await checkpoint(99)
+        started.set()
+        await asyncio.sleep(60)
+
+    worker = asyncio.create_task(run_outbox_worker(outbox, anchor, poll_interval=0.01))
+    await asyncio.wait_for(started.wait(), 5)
+    worker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+
+    assert threads and threading.main_thread() not in threads
+    assert outbox.get("c1")["status"] == PENDING  # lease handed back on shutdown
+
+
+def _agent_with_chain(receipts: dict, mempool: set) -> BlockchainAgent:
+    """BlockchainAgent over a fake eth namespace (no provider needed)"""
+
+    async def get_transaction_receipt(tx_hash):
+        if bytes(tx_hash) not in receipts:
+            raise TransactionNotFound("not mined")
+        return receipts[bytes(tx_hash)]
+
+    async def get_transaction(tx_hash):
+        if bytes(tx_hash) not in mempool:
+            raise TransactionNotFound("unknown")
+        return {}
+
+    agent = BlockchainAgent.__new__(BlockchainAgent)
+    agent.w3 = SimpleNamespace(eth=SimpleNamespace(get_transaction_receipt=get_transaction_receipt,
+                                                   get_transaction=get_transaction))
+    agent.receipt_timeout, agent.receipt_poll_interval = 1, 0.01
+    return agent
+
+
+async def test_previous_success_is_confirmed_not_resent():
+    agent = _agent_with_chain({b"\xfe\xed": SimpleNamespace(status=1, gasUsed=21000)}, set())
+    findings = {"steps": []}
+    assert await agent._confirm_previous_attempt({"tx_hash": "feed", "blockchain_claim_id": 1}, findings)
+    assert findings["status"] == "success" and findings["tx_hash"] == "feed"
+
+
+async def test_dropped_or_reverted_previous_tx_is_resubmitted():
+    agent = _agent_with_chain({b"\x0b\xad": SimpleNamespace(status=0, gasUsed=1)}, set())
+    assert not await agent._confirm_previous_attempt({"tx_hash": "feed"}, {"steps": []})
+    assert not await agent._confirm_previous_attempt({"tx_hash": "0bad"}, {"steps": []})
+    assert not await agent._confirm_previous_attempt({"tx_hash": None}, {"steps": []})
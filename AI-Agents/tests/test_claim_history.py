@@ -0,0 +1,128 @@
+# tests/test_claim_history.py
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.fraud_agent import FraudAgent
+from src.utils import clients
+from src.utils.claim_history import ClaimFrequencyCache
+
+
+class SupabaseStandIn:
+    """Local stand-in for the supabase-py query builder over an in-memory claims table.
+
+    Supports the select(count="exact").eq().gte().execute() chain FraudAgent
+    uses, with a fixed per-query latency, and counts round trips.
+    """
+
+    def __init__(self, rows, latency: float = 0.02):
+        self.rows = rows
+        self.latency = latency
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        return _Query(self, self.rows if name == "claims" else [])
+
+
+class _Query:
+    def __init__(self, db, rows):
+        self.db, self.rows, self.count_mode = db, rows, None
+
+    def select(self, columns, count=None):
+        self.count_mode = count
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def gte(self, column, value):
+        self.rows = [r for r in self.rows if r[column] >= value]
+        return self
+
+    def execute(self):
+        time.sleep(self.db.latency)  # the real client is sync and runs in a worker thread
+        with self.db._lock:
+            self.db.round_trips += 1
+        return SimpleNamespace(data=self.rows, count=len(self.rows) if self.count_mode == "exact" else None)
+
+
+def _claims(user_id, n, days_ago=10):
+    created = (datetime.utcnow() - timedelta(days=days_ago)).isoformat()
+    return [{"id": f"{user_id}-{i}", "user_id": user_id, "created_at": created} for i in range(n)]
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    db = SupabaseStandIn(_claims("u1", 3) + _claims("u2", 1) + _claims("u2", 4, days_ago=400))
+    monkeypatch.setattr(clients, "_supabase_client", db)
+    monkeypatch.setattr(clients, "_supabase_checked", True)
+    return db
+
+
+async def test_rolling_count_matches_the_database_with_one_round_trip_per_user(supabase):
+    agent, cache = FraudAgent(), ClaimFrequencyCache(ttl=60)
+
+    async def count(user_id, claim_id):
+        return await cache.get_count(user_id, claim_id, lambda: agent._fetch_claim_count(user_id))
+
+    assert await count("u1", "u1-2") == 3  # fetched count already includes this claim
+    assert await count("u2", "u2-0") == 1  # the 400-day-old claims are outside the window
+
+    # New claims are recorded by the backend first; the cache adds them locally
+    for i in range(3, 8):
+        supabase.rows.append(_claims("u1", 1)[0] | {"id": f"u1-{i}"})
+        assert await count("u1", f"u1-{i}") == await agent._fetch_claim_count("u1")
+    assert await count("u1", "u1-7") == 8  # re-assessing a claim does not double-count
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["local_increments"]) == (2, 5)
+    assert supabase.round_trips == 2 + 5  # cache queries + the uncached comparison queries above
+
+
+async def test_cache_cuts_round_trips_under_concurrent_claims(supabase):
+    agent, cache = FraudAgent(), ClaimFrequencyCache(ttl=60)
+    claims = [(f"u{i % 2 + 1}", f"new-{i}") for i in range(40)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        cache.get_count(user, claim, lambda user=user: agent._fetch_claim_count(user)) for user, claim in claims
+    ))
+    cached_elapsed = time.perf_counter() - started
+    assert supabase.round_trips == 2
+
+    supabase.round_trips = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(agent._fetch_claim_count(user) for user, _ in claims))
+    uncached_elapsed = time.perf_counter() - started
+    assert supabase.round_trips == len(claims)
+    print(f"\n{len(claims)} claims: cached {cached_elapsed * 1000:.0f} ms / 2 queries, "
+          f"uncached {uncached_elapsed * 1000:.0f} ms / {len(claims)} queries")
+
+
+async def test_cancelled_fetch_does_not_strand_waiters():
+    cache, release, calls = ClaimFrequencyCache(), asyncio.Event(), []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return 4
+
+    owner = asyncio.create_task(cache.get_count("u1", "c1", fetch))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_count("u1", "c2", fetch))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    release.set()
+
+    assert await asyncio.wait_for(waiter, timeout=1) == 4
+    assert len(calls) == 2
+    assert not cache._inflight
@@ -0,0 +1,103 @@
+# tests/test_damage_agent.py
+import base64
+import json
+
+import pytest
+
+from helpers import photo_bytes
+from src.agents import damage_agent as damage_module
+from src.agents.damage_agent import DamageAgent
+from src.utils.phash_index import PhashIndex
+
+RED, BLUE = (200, 40, 40), (30, 60, 220)
+DAMAGE = {"valid_evidence": True, "severity": "moderate", "description": "dented bumper",
+          "estimate_min": 400, "estimate_max": 900, "confidence": 90}
+WRONG_SUBJECT = {"valid_evidence": False, "severity": "none", "description": "a hospital bed",
+                 "estimate_min": 0, "estimate_max": 0, "confidence": 80}
+
+
+def _assess(image) -> dict:
+    return WRONG_SUBJECT if image.convert("RGB").getpixel((5, 5))[2] > 150 else DAMAGE
+
+
+@pytest.fixture
+def agent(upstream, monkeypatch, tmp_path):
+    upstream.latency = 0
+    upstream.photos = lambda url: photo_bytes(BLUE if "blue" in url else RED, size=(900, 600))
+    upstream.vision_reply = lambda images: json.dumps(
+        _assess(images[0]) if len(images) == 1 else [_assess(image) for image in images]
+    )
+    monkeypatch.setattr(damage_module, "phash_index", PhashIndex(str(tmp_path / "phash.sqlite3")))
+    return DamageAgent()
+
+
+def _claim(claim_id, urls):
+    return {"claim_id": claim_id, "claim_type": "auto", "requested_amount": 700,
+            "description": "rear-ended", "damage_photo_urls": urls}
+
+
+async def test_mismatched_photos_raise_one_flag_with_counts(agent):
+    urls = ["https://img.test/m1-red.jpg", "https://img.test/m1-blue.jpg", "https://img.test/m1-blue-2.jpg"]
+    findings = (await agent.process(_claim("m1", urls)))["findings"]
+
+    assert [f for f in findings["red_flags"] if f.startswith("Photo type mismatch")] == [
+        "Photo type mismatch: 2 of 3 photos show a hospital bed, not auto damage. "
+        "Consider filing as a health/medical claim instead."
+    ]
+    assert findings["mismatched_photos"] == [2, 3]
+    assert findings["damage_detected"] is True
+
+
+async def test_single_photo_mismatch_keeps_the_original_wording(agent):
+    findings = (await agent.process(_claim("s1", ["https://img.test/s1-blue.jpg"])))["findings"]
+    assert findings["red_flags"] == [
+        "Photo type mismatch: Image shows a hospital bed, not auto damage. Consider filing as a health/medical claim instead."
+    ]
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ("42", [None]),
+    ('"looks fine"', [None]),
+    ("null", [None]),
+    ('["a bumper", {"severity": "minor"}]', [None, {"severity": "minor"}]),
+    ('{"severity": "minor", "estimate_min": "about 400"}', [None]),
+])
+def test_malformed_vision_json_counts_as_unparseable(agent, reply, expected):
+    assert agent._parse_vision_response(reply, len(expected)) == expected
+
+
+async def test_partial_vision_failure_is_counted_not_flagged(agent, upstream):
+    replies = iter(["not json", json.dumps(DAMAGE)])
+    upstream.vision_reply = lambda images: next(replies)
+    agent.max_concurrent_photos = 1  # deterministic reply order
+    findings = (await agent.process(_claim("p1", ["https://img.test/p1-a.jpg", "https://img.test/p1-b.jpg"])))["findings"]
+
+    assert findings["photos_unanalyzed"] == 1
+    assert findings["red_flags"] == []
+
+
+async def test_duplicate_photos_raise_one_flag(agent):
+    await agent.process(_claim("first", ["https://img.test/first-red.jpg"]))
+    findings = (await agent.process(_claim("again", ["https://img.test/again-1.jpg", "https://img.test/again-2.jpg"])))["findings"]
+
+    assert [f for f in findings["red_flags"] if f.startswith("Duplicate photo")] == [
+        "Duplicate photo: 2 of 2 photo(s) match photos from other claims (closest: claim first, hash distance 0)"
+    ]
+    assert [d["photo"] for d in findings["duplicate_photo_matches"]] == [1, 2]
+
+
+async def test_bytes_saved_comes_from_the_payloads_sent(agent, monkeypatch):
+    prepare, calls = agent._prepare_vision_image, []
+
+    async def counting_prepare(url):
+        calls.append(url)
+        return await prepare(url)
+
+    monkeypatch.setattr(agent, "_prepare_vision_image", counting_prepare)
+    urls = ["https://img.test/b1-a.jpg", "https://img.test/b1-b.jpg"]
+    findings = (await agent.process(_claim("b1", urls)))["findings"]
+
+    assert sorted(calls) == urls  # once per photo, for the vision request only
+    sent = [len(base64.b64decode((await prepare(url))["base64"])) for url in urls]
+    original = len(photo_bytes(RED, size=(900, 600)))
+    assert findings["vision_bytes_saved"] == sum(original - size for size in sent)
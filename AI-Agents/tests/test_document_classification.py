@@ -0,0 +1,71 @@
+# tests/test_document_classification.py
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents import document_agent as document_module
+from src.agents.document_agent import DocumentAgent, normalize_document_type
+from src.utils.classification_cache import ClassificationCache
+
+BILL = "City Hospital. Patient: A. Rao. Diagnosis: fractured wrist. Amount due: 12,400. " * 5
+
+
+@pytest.mark.parametrize("reply,expected", [
+    ("MEDICAL_BILL", "MEDICAL_BILL"),
+    ("  medical_bill\n", "MEDICAL_BILL"),
+    ('"Medical Bill".', "MEDICAL_BILL"),
+    ("Category: POLICE_REPORT", "POLICE_REPORT"),
+    ("`INVOICE_RECEIPT`", "INVOICE_RECEIPT"),
+    ("UNKNOWN", "UNKNOWN"),
+    ("HOSPITAL_DISCHARGE_SUMMARY", None),
+    ("MEDICAL_BILL or INVOICE_RECEIPT", None),
+    ("", None),
+])
+def test_normalize_document_type(reply, expected):
+    assert normalize_document_type(reply) == expected
+
+
+class FakeLLM:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(content=self.replies.pop(0))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fresh = ClassificationCache()
+    monkeypatch.setattr(document_module, "classification_cache", fresh)
+    return fresh
+
+
+def _agent(monkeypatch, llm) -> DocumentAgent:
+    monkeypatch.setattr(DocumentAgent, "llm", property(lambda self: llm))
+    return DocumentAgent()
+
+
+async def test_invalid_label_is_not_cached(monkeypatch, cache):
+    llm = FakeLLM("I think this is a hospital discharge summary", "MEDICAL_BILL")
+    agent = _agent(monkeypatch, llm)
+
+    assert await agent._classify_document_type(BILL) == "UNKNOWN"
+    assert cache.get(BILL) is None
+    # The next look at the same template asks again and caches the valid answer
+    assert await agent._classify_document_type(BILL) == "MEDICAL_BILL"
+    assert await agent._classify_document_type(BILL) == "MEDICAL_BILL"
+    assert llm.calls == 2
+
+
+async def test_normalized_label_is_cached(monkeypatch, cache):
+    agent = _agent(monkeypatch, FakeLLM('"medical bill"'))
+    assert await agent._classify_document_type(BILL) == "MEDICAL_BILL"
+    assert cache.get(BILL) == "MEDICAL_BILL"
+
+
+async def test_batch_reply_is_normalized(monkeypatch, cache):
+    agent = _agent(monkeypatch, FakeLLM('["medical bill", "Police Report"]'))
+    texts = [BILL, "Police station case number 44/2024, officer on duty filed this report. " * 5]
+    assert await agent._classify_documents(texts) == ["MEDICAL_BILL", "POLICE_REPORT"]
@@ -0,0 +1,116 @@
+# tests/test_fraud_fast_path.py
+import json
+import random
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.agents import base_agent
+from src.agents import fraud_agent as fraud_module
+from src.agents.fraud_agent import FraudAgent
+from src.utils.fraud_policy import FAST_APPROVE, FAST_REJECT, LLM_PATH, FastPathPolicy
+
+
+class CountingLLM:
+    """Stands in for llm_with_tools: no tool calls, a fixed JSON verdict per claim"""
+
+    def __init__(self, risk_by_claim: dict):
+        self.risk_by_claim = risk_by_claim
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        claim = next(c for c in self.risk_by_claim if c in messages[-1].content)
+        return AIMessage(content=json.dumps({"risk_score": self.risk_by_claim[claim], "red_flags": [], "reason": "ok"}))
+
+
+def _historical_claims(n: int = 300, seed: int = 11):
+    """Synthetic claim log with roughly the signal mix seen in production"""
+    rng = random.Random(seed)
+    claims = []
+    for i in range(n):
+        doc_findings = {"red_flags": [], "document_type_matches": rng.random() > 0.15}
+        damage_findings = {"red_flags": [], "damage_detected": rng.random() > 0.12}
+        if rng.random() < 0.2:
+            damage_findings["red_flags"].append("Duplicate photo: 1 of 2 photo(s) match photos from other claims")
+        claims.append({
+            "claim_id": f"CLM{i:04d}",
+            "user_id": f"user-{i}",
+            "requested_amount": rng.choice([150, 400, 900, 2500, 8000, 25000]),
+            "description": f"Claim CLM{i:04d}: rear bumper damage",
+            "agent_reports": {
+                "document_agent": {"findings": doc_findings},
+                "damage_agent": {"findings": damage_findings},
+            },
+            "claim_count": rng.choice([0, 0, 0, 1, 2, 4, 7]),
+            "llm_risk": rng.randint(0, 60),
+        })
+    return claims
+
+
+async def _run(claims, policy: FastPathPolicy, monkeypatch, history_check: bool = True):
+    monkeypatch.setattr(fraud_module, "fraud_fast_path", policy)
+    monkeypatch.setattr(base_agent, "get_supabase", lambda: object())
+    monkeypatch.setenv("FRAUD_CLAIM_HISTORY_CHECK", "true" if history_check else "false")
+    agent = FraudAgent()
+    counts = {c["user_id"]: c["claim_count"] for c in claims}
+
+    async def fetch_claim_count(user_id):
+        return counts[user_id]
+
+    agent._fetch_claim_count = fetch_claim_count
+    agent._llm_with_tools = CountingLLM({c["claim_id"]: c["llm_risk"] for c in claims})
+    fraud_module.claim_frequency_cache._entries.clear()
+    findings = [(await agent.process(claim))["findings"] for claim in claims]
+    return findings, agent._llm_with_tools.calls
+
+
+@pytest.fixture
+def history():
+    return _historical_claims()
+
+
+async def test_replay_report_matches_a_live_run(history, monkeypatch):
+    baseline, baseline_calls = await _run(history, FastPathPolicy(enabled=False), monkeypatch)
+    assert baseline_calls == len(history)
+
+    policy = FastPathPolicy(approve_max_amount=500)
+    report = policy.replay(baseline)
+    live, live_calls = await _run(history, FastPathPolicy(approve_max_amount=500), monkeypatch)
+
+    assert report["total"] == len(history)
+    assert report["decisions"][LLM_PATH] == live_calls
+    assert report["llm_calls_skipped"] == len(history) - live_calls
+    assert report["llm_call_rate_saved"] > 0.2
+    print(f"\nfast-path replay over {len(history)} historical claims: {report}")
+
+    # fast_reject can never change a verdict: the LLM stage only adds risk
+    for before, after in zip(baseline, live):
+        if after["decision_path"] == FAST_REJECT:
+            assert before["fraud_detected"] and after["fraud_detected"]
+
+
+async def test_default_policy_only_skips_certain_rejections(history, monkeypatch):
+    baseline, _ = await _run(history, FastPathPolicy(enabled=False), monkeypatch)
+    report = FastPathPolicy().replay(baseline)
+
+    assert report["decisions"][FAST_APPROVE] == 0
+    assert report["decisions"][FAST_REJECT] == sum(f["pre_llm_risk_score"] >= 71 for f in baseline)
+
+
+async def test_frequent_claimer_scoring_is_off_by_default(history, monkeypatch):
+    frequent = [c for c in history if c["claim_count"] > 5][:5]
+    monkeypatch.delenv("FRAUD_CLAIM_HISTORY_CHECK", raising=False)
+    assert FraudAgent().claim_history_check is False
+
+    enabled, _ = await _run(frequent, FastPathPolicy(enabled=False), monkeypatch)
+    disabled, _ = await _run(frequent, FastPathPolicy(enabled=False), monkeypatch, history_check=False)
+    assert all(any(flag.startswith("Frequent claimer") for flag in f["red_flags"]) for f in enabled)
+    assert not any(flag.startswith("Frequent claimer") for f in disabled for flag in f["red_flags"])
+
+
+def test_replay_leaves_live_counters_untouched():
+    policy = FastPathPolicy(approve_max_amount=500)
+    policy.record(LLM_PATH)
+    policy.replay([{"pre_llm_risk_score": 90, "pre_llm_red_flag_count": 2, "requested_amount": 100}])
+    assert policy.stats()["decisions"] == {LLM_PATH: 1, FAST_REJECT: 0, FAST_APPROVE: 0}
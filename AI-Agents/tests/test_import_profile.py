@@ -0,0 +1,71 @@
+# tests/test_import_profile.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+AI_AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that only the agents, tools and OCR workers need
+HEAVY_MODULES = [
+    "langgraph", "langsmith", "langchain_core", "langchain_openai", "openai", "web3", "eth_utils",
+    "pytesseract", "pdf2image", "PIL", "imagehash", "supabase", "tavily", "httpx",
+]
+
+
+def import_profile(module: str) -> dict:
+    """Run `python -X importtime -c "import module"` in a fresh interpreter.
+
+    Returns {"total_seconds", "modules": {name: cumulative_us}, "top": [(name, cumulative_us)]},
+    where top lists the slowest top-level packages.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AI_AGENTS_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    modules = {}
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0), int(cumulative))
+    total = modules.get(module, 0)
+    top = sorted(((p, us) for p, us in packages.items() if p != module.split(".")[0]),
+                 key=lambda item: item[1], reverse=True)[:10]
+    return {"total_seconds": total / 1e6, "modules": modules, "top": top}
+
+
+def _report(label: str, profile: dict) -> str:
+    lines = [f"{label}: {profile['total_seconds']:.2f}s"]
+    lines += [f"  {name:<24} {us / 1e6:6.3f}s" for name, us in profile["top"]]
+    return "\n".join(lines)
+
+
+def loaded_modules(module: str) -> set:
+    """Names in sys.modules after importing `module` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"],
+        cwd=AI_AGENTS_DIR, capture_output=True, text=True, check=True,
+    )
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_app_import_skips_heavy_dependencies():
+    modules = loaded_modules("src.main")
+    assert [m for m in HEAVY_MODULES if m in modules] == []
+    # ...which the agents do pull in
+    assert {"langgraph", "web3", "openai"} <= loaded_modules("src.workflows.claim_workflow")
+
+
+@pytest.mark.benchmark
+def test_app_import_is_a_fraction_of_agent_import():
+    # Importing the workflow is what src.main used to do at module level
+    main, workflow = import_profile("src.main"), import_profile("src.workflows.claim_workflow")
+    print("\n" + _report("import src.main", main) + "\n" + _report("import src.workflows.claim_workflow", workflow))
+    assert main["total_seconds"] < workflow["total_seconds"] / 2
@@ -0,0 +1,171 @@
+# tests/test_nonce_manager.py
+import asyncio
+
+import pytest
+from eth_account import Account
+from web3 import AsyncWeb3
+from web3.exceptions import TimeExhausted, Web3RPCError
+
+from helpers import FakeChain, RPCError, decode_raw_tx
+from src.agents.blockchain_agent import BlockchainAgent
+from src.utils.nonce_manager import NonceManager
+
+BLOCK_TIME = 0.05
+RPC_LATENCY = 0.005
+
+
+class FakeCall:
+    async def estimate_gas(self, tx):
+        await asyncio.sleep(RPC_LATENCY)
+        return 50000
+
+    async def build_transaction(self, tx):
+        return {**tx, "to": "0x" + "11" * 20, "value": 0, "data": "0x"}
+
+
+def _agent(chain: FakeChain) -> BlockchainAgent:
+    """BlockchainAgent on an AsyncWeb3 backed by the fake node (real signing, fake RPC)"""
+    account = Account.create()
+    agent = BlockchainAgent.__new__(BlockchainAgent)
+    agent.w3 = AsyncWeb3(chain)
+    agent.account, agent.private_key = account, account.key
+    agent.gas_margin = 1.2
+    agent.receipt_timeout, agent.receipt_poll_interval = 1.0, 0.01
+    agent.nonces = NonceManager(agent.w3, account.address)
+    return agent
+
+
+async def _claim_tx(agent):
+    """One claim's on-chain write: send, then wait for the receipt"""
+    tx_hash = await agent._send_transaction(FakeCall(), fallback_gas=100000)
+    return await agent._wait_for_receipt(tx_hash)
+
+
+async def _run_claims(claims: int, pipelined: bool):
+    node = FakeChain(block_time=BLOCK_TIME, latency=RPC_LATENCY)
+    node.start()
+    try:
+        agent = _agent(node)
+        if pipelined:
+            receipts = await asyncio.gather(*(_claim_tx(agent) for _ in range(claims)))
+        else:
+            receipts = [await _claim_tx(agent) for _ in range(claims)]
+        return node, agent, receipts
+    finally:
+        node.stop()
+
+
+async def test_pipelined_sends_overlap_and_share_blocks():
+    claims = 20
+    serial_node, _, serial_receipts = await _run_claims(claims, pipelined=False)
+    node, agent, receipts = await _run_claims(claims, pipelined=True)
+
+    assert node.latest == claims and sorted(nonce for nonce, _ in node.sent) == list(range(claims))
+    assert agent.nonces.stats()["unconfirmed"] == 0
+    # Serialized: one send at a time and one block per claim
+    assert serial_node.peak_sends_in_flight == 1
+    assert len({r.blockNumber for r in serial_receipts}) == claims
+    # Pipelined: sends overlap and each block carries several claims
+    assert node.peak_sends_in_flight > 1
+    assert len({r.blockNumber for r in receipts}) < claims
+
+
+async def test_dropped_transaction_is_rebroadcast_after_receipt_timeout():
+    node = FakeChain(block_time=BLOCK_TIME, latency=RPC_LATENCY, drop_nonces={2})
+    node.start()
+    try:
+        agent = _agent(node)
+        agent.receipt_timeout = 0.5
+        results = await asyncio.gather(*(_claim_tx(agent) for _ in range(5)), return_exceptions=True)
+
+        # Everything from the dropped nonce on stalls and times out
+        assert sum(isinstance(r, TimeExhausted) for r in results) == 3
+        stats = agent.nonces.stats()
+        assert stats["rebroadcasts"] >= 1
+
+        # The gap was filled from the same signed bytes, so the queued ones mine too
+        for _ in range(40):
+            if node.latest == 5:
+                break
+            await asyncio.sleep(BLOCK_TIME)
+        assert node.latest == 5
+        assert len(node.hashes_seen) == 5  # re-broadcast, never re-signed
+        await _claim_tx(agent)
+        assert node.latest == 6
+    finally:
+        node.stop()
+
+
+async def test_recover_reuses_a_nonce_nobody_holds():
+    node = FakeChain()
+    manager = NonceManager(AsyncWeb3(node), Account.create().address)
+    for _ in range(3):
+        await manager.allocate()
+    await manager.release(1)
+    manager._released.clear()  # simulate the release being lost
+    manager._outstanding.clear()
+
+    result = await manager.recover()
+    assert result["reused"] == [0, 1, 2]
+    assert [await manager.allocate() for _ in range(4)] == [0, 1, 2, 3]
+
+
+async def test_recover_never_reuses_nonces_mined_during_rebroadcast():
+    node = FakeChain(latency=RPC_LATENCY, drop_nonces={2})
+    agent = _agent(node)
+    hashes = [await agent._send_transaction(FakeCall(), fallback_gas=100000) for _ in range(5)]
+    node.mine_block()  # 0 and 1 mine; 3 and 4 queue behind the dropped 2
+
+    real_send = node._eth_sendRawTransaction
+
+    async def send_and_mine(raw):
+        tx_hash = await real_send(raw)
+        node.mine_block()  # the gap fills and 2..4 mine before recover() looks again
+        for tx in hashes:
+            if "0x" + bytes(tx).hex() in node.receipts:
+                agent.nonces.confirm(tx)
+        return tx_hash
+
+    node._eth_sendRawTransaction = send_and_mine
+    result = await agent.nonces.recover()
+
+    assert result["rebroadcast"] == [2]
+    assert result["reused"] == []
+    assert node.latest == 5
+    assert await agent.nonces.allocate() == 5
+
+
+async def test_ambiguous_send_failure_keeps_the_nonce():
+    node = FakeChain(latency=RPC_LATENCY)
+    agent = _agent(node)
+
+    async def timeout(raw):
+        nonce, tx_hash, _ = decode_raw_tx(raw)
+        node.pool[nonce] = tx_hash  # it did reach the node
+        raise asyncio.TimeoutError()
+
+    node._eth_sendRawTransaction = timeout
+    with pytest.raises(asyncio.TimeoutError):
+        await agent._send_transaction(FakeCall(), fallback_gas=100000)
+
+    stats = agent.nonces.stats()
+    assert stats["uncertain_sends"] == 1 and stats["unconfirmed"] == 1
+    assert await agent.nonces.allocate() == 1
+
+
+async def test_rejected_send_releases_the_nonce():
+    node = FakeChain(latency=RPC_LATENCY)
+    agent = _agent(node)
+
+    async def reject(raw):
+        raise RPCError("insufficient funds for gas * price + value")
+
+    real_send = node._eth_sendRawTransaction
+    node._eth_sendRawTransaction = reject
+    with pytest.raises(Web3RPCError):
+        await agent._send_transaction(FakeCall(), fallback_gas=100000)
+
+    node._eth_sendRawTransaction = real_send
+    assert agent.nonces.stats()["unconfirmed"] == 0
+    await agent._send_transaction(FakeCall(), fallback_gas=100000)
+    assert list(node.pool) == [0]
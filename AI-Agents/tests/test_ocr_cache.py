@@ -0,0 +1,24 @@
+# tests/test_ocr_cache.py
+from src.utils.ocr_cache import OCRCache
+
+
+def test_hits_do_not_write_to_sqlite(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr.sqlite3"))
+    cache.put("a", ["page one"], [])
+    writes = cache._conn.total_changes
+
+    for _ in range(10):
+        assert cache.get("a") == {"pages": ["page one"], "dates": []}
+    assert cache._conn.total_changes == writes
+    assert cache.stats()["hits"] == 10
+
+
+def test_recent_hits_still_protect_entries_from_eviction(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr.sqlite3"), max_bytes=200)
+    cache.put("old", ["x" * 50], [])
+    cache.put("newer", ["y" * 50], [])
+    cache.get("old")  # now the most recently used
+
+    cache.put("newest", ["z" * 50], [])
+    assert cache.get("old") is not None
+    assert cache.get("newer") is None
@@ -0,0 +1,117 @@
+# tests/test_ocr_engine.py
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils import ocr_engine as ocr_module
+from src.utils.ocr_engine import OCREngine
+
+PDF = b"%PDF-1.4\n" + b"\x00" * (2 * 1024 * 1024)  # stands in for a 2 MB scan
+
+
+class FakeWorkers:
+    """Swap the pdf2image/tesseract worker functions for recorders (run on a thread pool)"""
+
+    def __init__(self, pages: int, delay: float = 0.0):
+        self.pages = pages
+        self.delay = delay
+        self.calls = []
+        self.seen_content = []
+        self._lock = threading.Lock()
+
+    def page_count(self, pdf_path, timeout):
+        with open(pdf_path, "rb") as f:
+            self.seen_content.append(f.read())
+        return self.pages
+
+    def ocr_page(self, pdf_path, page_number, dpi, max_edge, timeout):
+        with self._lock:
+            self.calls.append((pdf_path, page_number, dpi, max_edge, timeout))
+        time.sleep(self.delay)
+        return f"page {page_number}"
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    fake = FakeWorkers(pages=6)
+    monkeypatch.setattr(ocr_module, "_pdf_page_count", fake.page_count)
+    monkeypatch.setattr(ocr_module, "_ocr_pdf_page", fake.ocr_page)
+    return fake
+
+
+@pytest.fixture
+def engine():
+    engine = OCREngine(max_workers=4, max_pages=20, timeout=5)
+    engine._executor = ThreadPoolExecutor(max_workers=4)
+    yield engine
+    engine.shutdown()
+
+
+async def test_pdf_bytes_are_written_once_and_tasks_carry_only_the_path(engine, workers):
+    pages = await engine.extract_pages(PDF, "application/pdf")
+
+    assert pages == [f"page {n}" for n in range(1, 7)]
+    assert workers.seen_content == [PDF]
+    paths = {path for path, *_ in workers.calls}
+    assert len(paths) == 1
+    # What each page task would pickle to a worker process
+    payload = max(len(pickle.dumps(call)) for call in workers.calls)
+    assert payload < 512
+    assert not os.path.exists(paths.pop())
+
+
+async def test_temp_pdf_is_removed_when_pages_time_out(engine, workers):
+    workers.delay = 0.5
+    engine.timeout = 0.05
+    pages = await engine.extract_pages(PDF, "application/pdf")
+
+    assert pages == [None] * 6
+    assert not os.path.exists(workers.calls[0][0])
+
+
+async def test_page_limit_still_applies(engine, workers):
+    workers.pages = 50
+    pages = await engine.extract_pages(PDF, "application/pdf")
+    assert len(pages) == engine.max_pages
+
+
+async def test_timed_out_pages_are_dropped_and_workers_get_the_deadline(engine, workers):
+    engine._executor.shutdown()
+    engine._executor = ThreadPoolExecutor(max_workers=1)
+    workers.delay = 0.3
+    engine.timeout = 0.05
+    pages = await engine.extract_pages(PDF, "application/pdf")
+
+    assert pages == [None] * 6
+    # Only the page already running was started; the queued ones were cancelled
+    assert [call[1] for call in workers.calls] == [1]
+    assert workers.calls[0][-1] == engine.timeout
+
+
+@pytest.fixture
+def process_engine():
+    engine = OCREngine(max_workers=1, timeout=30)
+    yield engine
+    engine.shutdown()
+
+
+def test_process_pool_spawns_workers(process_engine):
+    assert process_engine.executor._mp_context.get_start_method() == "spawn"
+
+
+async def test_pdf_task_round_trips_through_a_spawned_worker(process_engine):
+    # The real worker runs in a child process: its arguments and its error are pickled both ways
+    with pytest.raises(Exception) as error:
+        await process_engine.extract_pages(b"%PDF-1.4 not really a pdf", "application/pdf")
+    assert type(error.value).__module__ == "pdf2image.exceptions"
+
+
+async def test_image_task_round_trips_through_a_spawned_worker(process_engine):
+    from PIL import UnidentifiedImageError
+
+    with pytest.raises(UnidentifiedImageError):
+        await process_engine.extract_pages(b"not an image", "image/png")
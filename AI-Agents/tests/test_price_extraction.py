@@ -0,0 +1,52 @@
+# tests/test_price_extraction.py
+import time
+
+import pytest
+
+from src.utils.price_extraction import PriceRange, extract_price_ranges, market_range
+
+# (snippet, expected market range) pairs modelled on Tavily search results
+CORPUS = [
+    ("Bumper replacement typically costs ₹2,500-₹8,500 depending on the model.", (2500, 8500, "INR")),
+    ("Expect to pay $500 to $1,500 for a new windshield.", (500, 1500, "USD")),
+    ("Rs. 12,000 - 18,000 for a full respray at authorised centres.", (12000, 18000, "INR")),
+    ("Door panel repair: 3-5 days, costs between 4000 and 9000 rupees, or 4000-9000 rupees at dealers.", (4000, 9000, "INR")),
+    ("Engine rebuild quotes ranged from 1.5 lakh to 3 lakh in 2019-2024 listings.", (150000, 300000, None)),
+    ("Headlight assembly £120-£350. Call 020-7946-0958 for a quote.", (120, 350, "GBP")),
+    ("Prices of 2k-5k usd are common for hail damage.", (2000, 5000, "USD")),
+    ("Posted 12-03-2024. Service takes 10-15 km of test driving.", None),
+    # "repairs" and "colours" end in a currency code; the bare ranges after them are mileages
+    ("A transmission repair typically costs $400-$900, though repairs 2000-3000 miles after a "
+     "service are often covered. Older cars 1500-2500 need more work.",
+     (400, 900, "USD")),
+    ("Most colours 300-600 are in stock; paint jobs run €800-€2,000.", (800, 2000, "EUR")),
+    ("Typical cost: 2,500 to 6,000 INR for minor dents.", (2500, 6000, "INR")),
+]
+
+
+@pytest.mark.parametrize("snippet,expected", CORPUS)
+def test_market_range_corpus(snippet, expected):
+    market = market_range(extract_price_ranges(snippet))
+    if expected is None:
+        assert market is None
+    else:
+        assert market == PriceRange(*expected)
+
+
+def test_currency_codes_need_a_word_boundary():
+    assert extract_price_ranges("colours 300-600 available") == [PriceRange(300, 600, None)]
+    assert extract_price_ranges("prices usd 300-600") == [PriceRange(300, 600, "USD")]
+    assert extract_price_ranges("rs.300-600") == [PriceRange(300, 600, "INR")]
+
+
+@pytest.mark.benchmark
+def test_extraction_benchmark():
+    """Single-pass scan stays well under a millisecond per KB of search output"""
+    snippet = " ".join(text for text, _ in CORPUS) * 4
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        extract_price_ranges(snippet)
+    per_kb_ms = (time.perf_counter() - start) * 1000 / rounds / (len(snippet) / 1024)
+    print(f"\nprice extraction: {per_kb_ms:.3f} ms/KB over {len(snippet)} chars")
+    assert per_kb_ms < 5
@@ -0,0 +1,54 @@
+# tests/test_price_tool.py
+import asyncio
+
+import pytest
+
+from src.tools import price_tool
+
+
+class FakeTavily:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def search(self, query, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        return {"query": query, "results": []}
+
+
+@pytest.fixture
+def tavily(monkeypatch):
+    fake = FakeTavily()
+    monkeypatch.setattr(price_tool, "_get_tavily_client", lambda api_key: fake)
+    price_tool._search_cache.clear()
+    price_tool._inflight.clear()
+    return fake
+
+
+async def test_concurrent_identical_queries_share_one_search(tavily):
+    tasks = [asyncio.create_task(price_tool._search("Bumper price India?", "k")) for _ in range(5)]
+    await asyncio.sleep(0)
+    tavily.release.set()
+    results = await asyncio.gather(*tasks)
+    assert tavily.calls == 1
+    assert all(r == results[0] for r in results)
+    assert not price_tool._inflight
+
+
+async def test_cancelled_owner_does_not_strand_waiters(tavily):
+    owner = asyncio.create_task(price_tool._search("bumper price", "k"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(price_tool._search("bumper price", "k"))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    tavily.release.set()
+
+    # The waiter takes over the search instead of hanging on the abandoned future
+    result = await asyncio.wait_for(waiter, timeout=1)
+    assert result["query"] == "bumper price"
+    assert tavily.calls == 2
+    assert not price_tool._inflight
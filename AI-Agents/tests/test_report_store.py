@@ -0,0 +1,84 @@
+# tests/test_report_store.py
+import json
+import os
+
+import pytest
+from eth_utils import keccak
+
+from src.utils.report_store import (
+    ReportStore, canonical_json, merkle_proof, merkle_root, report_leaf, verify_proof,
+)
+
+REPORTS = {
+    "document_agent": {"confidence": 0.9, "findings": {"validity": "valid"}},
+    "damage_agent": {"confidence": 0.85, "findings": {"estimated_cost": 650}},
+    "fraud_agent": {"confidence": 0.8, "findings": {"risk_score": 20}},
+    "settlement_agent": {"confidence": 0.9, "findings": {"recommended_amount": 600}},
+}
+
+
+def _leaves(n):
+    return [report_leaf(f"agent_{i}", {"i": i}) for i in range(n)]
+
+
+def _oz_process_proof(leaf, proof):
+    """OpenZeppelin MerkleProof.processProof: commutative keccak over sorted pairs"""
+    computed = leaf
+    for sibling in proof:
+        computed = keccak(min(computed, sibling) + max(computed, sibling))
+    return computed
+
+
+def test_canonical_json_ignores_key_order():
+    assert canonical_json({"b": 1, "a": [1, 2]}) == canonical_json({"a": [1, 2], "b": 1}) == b'{"a":[1,2],"b":1}'
+
+
+def test_leaf_is_double_hashed():
+    inner = keccak(canonical_json({"agent": "fraud_agent", "report": {"risk_score": 20}}))
+    assert report_leaf("fraud_agent", {"risk_score": 20}) == keccak(inner)
+
+
+def test_root_edge_cases():
+    assert merkle_root([]) == b"\x00" * 32
+    leaf = _leaves(1)[0]
+    assert merkle_root([leaf]) == leaf
+    a, b = _leaves(2)
+    assert merkle_root([a, b]) == merkle_root([b, a]) == keccak(min(a, b) + max(a, b))
+
+
+@pytest.mark.parametrize("n", range(1, 10))
+def test_every_leaf_proves_against_the_root(n):
+    leaves = _leaves(n)
+    root = merkle_root(leaves)
+    assert merkle_root(list(reversed(leaves))) == root  # insertion order doesn't matter
+    for leaf in leaves:
+        proof = merkle_proof(leaves, leaf)
+        assert verify_proof(leaf, proof, root)
+        assert _oz_process_proof(leaf, proof) == root
+
+
+def test_tampered_leaf_or_proof_fails():
+    leaves = _leaves(5)
+    root = merkle_root(leaves)
+    proof = merkle_proof(leaves, leaves[0])
+    assert not verify_proof(report_leaf("agent_0", {"i": 99}), proof, root)
+    assert not verify_proof(leaves[0], proof[:-1], root)
+
+
+def test_store_round_trip_and_tamper_detection(tmp_path):
+    store = ReportStore(str(tmp_path))
+    root = store.put("claim-1", REPORTS)
+    root_hex = "0x" + root.hex()
+
+    assert root == merkle_root([report_leaf(agent, report) for agent, report in REPORTS.items()])
+    assert store.put("claim-1", dict(reversed(REPORTS.items()))) == root
+    assert store.get(root_hex)["reports"] == REPORTS
+    assert store.verify(root_hex) and store.verify(root_hex.upper().replace("0X", "0x"))
+    assert store.get("0x" + "00" * 32) is None and not store.verify("0x" + "00" * 32)
+
+    path = os.path.join(str(tmp_path), f"{root.hex()}.json")
+    bundle = json.loads(open(path).read())
+    bundle["reports"]["fraud_agent"]["findings"]["risk_score"] = 0
+    with open(path, "w") as f:
+        json.dump(bundle, f)
+    assert not store.verify(root_hex)
@@ -0,0 +1,69 @@
+# tests/test_startup.py
+import time
+
+import pytest
+
+from src.utils import clients
+
+
+@pytest.fixture
+def fresh_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.delenv("SUPABASE_URL", raising=False)
+    monkeypatch.setattr(clients, "_http_client", None)
+    monkeypatch.setattr(clients, "_openai_http_client", None)
+    monkeypatch.setattr(clients, "_openai_client", None)
+    monkeypatch.setattr(clients, "_chat_llms", {})
+    monkeypatch.setattr(clients, "_supabase_client", None)
+    monkeypatch.setattr(clients, "_supabase_checked", False)
+
+
+def test_building_the_workflow_constructs_no_clients(fresh_clients):
+    from src.workflows.claim_workflow import ClaimProcessingWorkflow
+
+    workflow = ClaimProcessingWorkflow()
+
+    assert clients._chat_llms == {}
+    assert clients._openai_client is None and clients._openai_http_client is None
+    assert clients._http_client is None
+    assert not clients._supabase_checked
+    assert workflow.graph is not None
+
+
+def test_agents_share_one_llm_and_one_connection_pool(fresh_clients):
+    from src.workflows.claim_workflow import ClaimProcessingWorkflow
+
+    workflow = ClaimProcessingWorkflow()
+    agents = [workflow.document_agent, workflow.damage_agent, workflow.fraud_agent,
+              workflow.settlement_agent, workflow.blockchain_agent]
+
+    assert len({id(agent.llm) for agent in agents}) == 1
+    assert len(clients._chat_llms) == 1
+    pool = clients._openai_http_client
+    assert clients.get_async_openai()._client is pool
+    assert agents[0].llm.http_async_client is pool
+    assert {agent.supabase for agent in agents} == {None}
+
+
+@pytest.mark.benchmark
+def test_shared_registry_startup_benchmark(fresh_clients):
+    """Per-agent construction (five ChatOpenAI + five AsyncOpenAI) vs the shared registry"""
+    from langchain_openai import ChatOpenAI
+    from openai import AsyncOpenAI
+
+    ChatOpenAI(model="gpt-4o-mini", api_key="test")  # import-time warm-up, not counted
+
+    started = time.perf_counter()
+    for _ in range(5):
+        ChatOpenAI(model="gpt-4o-mini", api_key="test", temperature=0.1)
+        AsyncOpenAI(api_key="test")
+    per_agent = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(5):
+        clients.get_chat_llm()
+        clients.get_async_openai()
+    shared = time.perf_counter() - started
+
+    print(f"\nclient construction for 5 agents: per-agent {per_agent * 1000:.1f} ms, shared {shared * 1000:.1f} ms")
+    assert shared < per_agent
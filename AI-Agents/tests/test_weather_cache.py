@@ -0,0 +1,62 @@
+# tests/test_weather_cache.py
+from src.tools import weather_tool
+from src.utils import clients
+from src.utils.weather_cache import WeatherCache
+
+async def _verify(location: str, date: str):
+    report = await weather_tool.verify_historical_weather.ainvoke({"location": location, "date": date})
+    assert "Weather Report" in report
+
+
+async def test_repeated_lookups_hit_both_cache_levels(weather_server):
+    # A day of claims: 5 distinct (location, date) pairs, each looked up 4 times
+    pairs = [("Pune", "2024-07-01"), ("Pune", "2024-07-02"), ("Mumbai", "2024-07-01"),
+             ("Nashik", "2024-07-03"), ("Bhumkar Chowk, Pune", "2024-07-01")]
+    for pair in pairs:
+        await _verify(*pair)
+
+    # Cold: Pune, Mumbai, Nashik geocoded once each ("Bhumkar Chowk" misses, then falls back to cached Pune);
+    # archive fetched once per distinct (cell, date)
+    assert weather_server.geocode_requests == 4
+    assert weather_server.archive_requests == 4
+
+    warm = pairs * 3
+    for pair in warm:
+        await _verify(*pair)
+
+    # Warm lookups never reach the network
+    assert weather_server.geocode_requests == 4
+    assert weather_server.archive_requests == 4
+    stats = weather_tool.weather_cache.stats()
+    assert stats["daily_hits"] == 1 + len(warm)  # the fallback address shares Pune's cell
+    assert stats["geocode_hit_rate"] >= 0.75
+    assert stats["daily_hit_rate"] == 0.8
+
+
+async def test_fallback_address_is_remembered(weather_server):
+    await _verify("Bhumkar Chowk, Pune", "2024-07-01")
+    requests = weather_server.geocode_requests
+    await _verify("Bhumkar Chowk, Pune", "2024-07-01")
+    assert weather_server.geocode_requests == requests
+
+
+async def test_archive_cache_survives_restart(weather_server, tmp_path):
+    await _verify("Pune", "2024-07-01")
+    weather_tool.weather_cache = WeatherCache(str(tmp_path / "weather.sqlite3"))
+    archive_requests = weather_server.archive_requests
+    await _verify("Pune", "2024-07-01")
+    assert weather_server.archive_requests == archive_requests
+
+
+async def test_expired_geocodes_are_fetched_again(weather_server, monkeypatch):
+    monkeypatch.setattr(weather_tool.weather_cache, "geocode_ttl", 0)
+    await _verify("Pune", "2024-07-01")
+    await _verify("Pune", "2024-07-01")
+    assert weather_server.geocode_requests == 2
+    assert weather_server.archive_requests == 1
+
+
+async def test_lookups_share_one_pooled_client(weather_server):
+    client = clients.get_http_client()
+    await _verify("Pune", "2024-07-01")
+    assert clients.get_http_client() is client
@@ -0,0 +1,77 @@
+# tests/test_weather_tool.py
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from src.models.claim_models import WeatherLookup
+from src.tools import weather_tool
+from src.utils.weather_cache import WeatherCache
+
+from helpers import CITIES
+
+def _lookups(n: int):
+    cities = sorted(CITIES)
+    base = datetime(2024, 7, 1)
+    return [(cities[i % len(cities)], (base + timedelta(days=i % 20)).strftime("%Y-%m-%d")) for i in range(n)]
+
+
+async def test_prefetch_needs_one_archive_request_per_cell(weather_server):
+    summary = await weather_tool.prefetch_historical_weather(_lookups(200))
+    assert summary["cells"] == 4
+    assert summary["requests"] == weather_server.archive_requests == 4
+    assert weather_server.geocode_requests == 4
+    assert summary["unresolved_locations"] == []
+
+
+async def test_prefetch_geocodes_concurrently(weather_server):
+    await weather_tool.prefetch_historical_weather(_lookups(8), concurrency=4)
+    assert weather_server.peak == 4
+
+
+async def test_prefetch_then_lookups_are_all_cache_hits(weather_server):
+    lookups = _lookups(40)
+    await weather_tool.prefetch_historical_weather(lookups)
+    requests_after_prefetch = weather_server.geocode_requests + weather_server.archive_requests
+    cache = weather_tool.weather_cache
+    misses_after_prefetch = (cache.geocode_misses, cache.daily_misses)
+
+    reports = await asyncio.gather(*(
+        weather_tool.verify_historical_weather.ainvoke({"location": loc, "date": date}) for loc, date in lookups
+    ))
+
+    assert all("Rain" in report for report in reports)
+    assert weather_server.geocode_requests + weather_server.archive_requests == requests_after_prefetch
+    assert (cache.geocode_misses, cache.daily_misses) == misses_after_prefetch
+    assert cache.geocode_hits == cache.daily_hits == len(lookups)
+
+
+async def test_second_prefetch_only_counts_cached_days(weather_server):
+    lookups = _lookups(40)
+    await weather_tool.prefetch_historical_weather(lookups)
+    summary = await weather_tool.prefetch_historical_weather(lookups)
+    assert summary["requests"] == 0
+    assert summary["already_cached"] == len(set(lookups))
+
+
+async def test_archive_errors_are_not_cached(weather_server):
+    weather_server.fail_archive = True
+    await weather_tool.prefetch_historical_weather([("Pune", "2024-07-01")])
+    assert not weather_tool.weather_cache.cached_dates(*CITIES["Pune"], ["2024-07-01"])
+
+    report = await weather_tool.verify_historical_weather.ainvoke({"location": "Pune", "date": "2024-07-01"})
+    assert "429" in report
+
+
+def test_put_daily_many_writes_all_rows(tmp_path):
+    cache = WeatherCache(str(tmp_path / "weather.sqlite3"))
+    records = {f"2024-07-{d:02d}": {"weather_code": 0} for d in range(1, 31)}
+    cache.put_daily_many(18.52, 73.86, records)
+    assert cache.cached_dates(18.52, 73.86, list(records)) == set(records)
+
+
+@pytest.mark.parametrize("date", ["2024-13-01", "01/07/2024", "yesterday", ""])
+def test_weather_lookup_rejects_malformed_dates(date):
+    with pytest.raises(ValidationError):
+        WeatherLookup(location="Pune", date=date)
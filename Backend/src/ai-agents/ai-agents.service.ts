@@ -12,6 +12,7 @@ interface ClaimProcessingRequest {
   damagePhotoUrls: string[];
   incidentDate?: string;
   location?: string;
+  userId?: string;
 }
 
 interface AIAssessmentResult {
@@ -58,6 +59,7 @@ export class AiAgentsService {
         damage_photo_urls: request.damagePhotoUrls || [],
         incident_date: request.incidentDate || new Date().toISOString(),
         location: request.location || 'Unknown',
+        user_id: request.userId,
       };
 
       this.logger.log(`Sending request to AI agents: ${JSON.stringify(aiAgentsRequest)}`);
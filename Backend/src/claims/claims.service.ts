@@ -383,6 +383,7 @@ export class ClaimsService {
         damagePhotoUrls: claimData.damage_photo_urls || [],
         incidentDate: claimData.incident_date,
         location: claimData.location,
+        userId: claimData.user_id,
       });
 
       this.logger.log(`[Claim ${claimId}] AI processing completed:`, {
@@ -38,6 +38,7 @@ contract ClaimRegistry is Ownable, ReentrancyGuard {
     event ClaimApproved(uint256 indexed claimId, uint256 approvedAmount, address indexed approvedBy);
     event ClaimRejected(uint256 indexed claimId, string reason, address indexed rejectedBy);
     event ClaimSettled(uint256 indexed claimId, uint256 settledAmount, address indexed claimant);
+    event AIAssessmentCommitted(uint256 indexed claimId, bytes32 reportsRoot);
 
     // Storage
     mapping(uint256 => Claim) public claims;
@@ -45,6 +46,7 @@ contract ClaimRegistry is Ownable, ReentrancyGuard {
     mapping(address => uint256[]) public userClaims;
     mapping(address => bool) public authorizedAgents;
     mapping(address => bool) public validators;
+    mapping(uint256 => bytes32) public assessmentRoots; // Merkle root of agent reports stored off-chain
 
     // Modifiers
     modifier onlyAuthorizedAgent() {
@@ -75,6 +77,80 @@ contract ClaimRegistry is Ownable, ReentrancyGuard {
         uint256 _requestedAmount,
         string memory _ipfsHash
     ) external onlyOwner returns (uint256) {
+        return _createClaim(_claimId, _claimant, _claimType, _requestedAmount, _ipfsHash);
+    }
+
+    // AI agent updates claim with assessment
+    function updateAIAssessment(
+        uint256 _claimId,
+        uint256 _confidenceScore,
+        uint256 _riskScore,
+        uint256 _recommendedAmount,
+        string[] memory _agentReports,
+        bool _fraudDetected
+    ) external onlyAuthorizedAgent claimExists(_claimId) {
+        _recordAssessment(_claimId, _confidenceScore, _riskScore, _recommendedAmount, _agentReports, _fraudDetected);
+    }
+
+    // Submit a new claim and its AI assessment in one transaction
+    // (same checks as submitClaim followed by updateAIAssessment)
+    function submitClaimWithAssessment(
+        uint256 _claimId,
+        address _claimant,
+        ClaimType _claimType,
+        uint256 _requestedAmount,
+        string memory _ipfsHash,
+        uint256 _confidenceScore,
+        uint256 _riskScore,
+        uint256 _recommendedAmount,
+        string[] memory _agentReports,
+        bool _fraudDetected
+    ) external onlyOwner onlyAuthorizedAgent returns (uint256) {
+        _createClaim(_claimId, _claimant, _claimType, _requestedAmount, _ipfsHash);
+        _recordAssessment(_claimId, _confidenceScore, _riskScore, _recommendedAmount, _agentReports, _fraudDetected);
+        return _claimId;
+    }
+
+    // AI agent updates claim with assessment, committing only the Merkle root of the
+    // full agent reports (kept off-chain) instead of storing them
+    function updateAIAssessmentRoot(
+        uint256 _claimId,
+        uint256 _confidenceScore,
+        uint256 _riskScore,
+        uint256 _recommendedAmount,
+        bytes32 _reportsRoot,
+        bool _fraudDetected
+    ) external onlyAuthorizedAgent claimExists(_claimId) {
+        _recordAssessment(_claimId, _confidenceScore, _riskScore, _recommendedAmount, new string[](0), _fraudDetected);
+        _commitReportsRoot(_claimId, _reportsRoot);
+    }
+
+    // submitClaimWithAssessment with the agent reports committed as a Merkle root
+    function submitClaimWithAssessmentRoot(
+        uint256 _claimId,
+        address _claimant,
+        ClaimType _claimType,
+        uint256 _requestedAmount,
+        string memory _ipfsHash,
+        uint256 _confidenceScore,
+        uint256 _riskScore,
+        uint256 _recommendedAmount,
+        bytes32 _reportsRoot,
+        bool _fraudDetected
+    ) external onlyOwner onlyAuthorizedAgent returns (uint256) {
+        _createClaim(_claimId, _claimant, _claimType, _requestedAmount, _ipfsHash);
+        _recordAssessment(_claimId, _confidenceScore, _riskScore, _recommendedAmount, new string[](0), _fraudDetected);
+        _commitReportsRoot(_claimId, _reportsRoot);
+        return _claimId;
+    }
+
+    function _createClaim(
+        uint256 _claimId,
+        address _claimant,
+        ClaimType _claimType,
+        uint256 _requestedAmount,
+        string memory _ipfsHash
+    ) internal returns (uint256) {
         require(_requestedAmount > 0, "Invalid amount");
         require(bytes(_ipfsHash).length > 0, "IPFS hash required");
         require(claims[_claimId].id == 0, "Claim ID already exists"); // <-- ADD THIS CHECK
@@ -97,15 +173,14 @@ contract ClaimRegistry is Ownable, ReentrancyGuard {
         return _claimId;
     }
 
-    // AI agent updates claim with assessment
-    function updateAIAssessment(
+    function _recordAssessment(
         uint256 _claimId,
         uint256 _confidenceScore,
         uint256 _riskScore,
         uint256 _recommendedAmount,
         string[] memory _agentReports,
         bool _fraudDetected
-    ) external onlyAuthorizedAgent claimExists(_claimId) {
+    ) internal {
         require(claims[_claimId].status == ClaimStatus.SUBMITTED, "Invalid status");
 
         aiAssessments[_claimId] = AIAssessment({
@@ -126,6 +201,12 @@ contract ClaimRegistry is Ownable, ReentrancyGuard {
         emit AIAssessmentUpdated(_claimId, msg.sender, _fraudDetected);
     }
 
+    function _commitReportsRoot(uint256 _claimId, bytes32 _reportsRoot) internal {
+        require(_reportsRoot != bytes32(0), "Reports root required");
+        assessmentRoots[_claimId] = _reportsRoot;
+        emit AIAssessmentCommitted(_claimId, _reportsRoot);
+    }
+
     // Validator approves claim
     function approveClaim(uint256 _claimId, uint256 _approvedAmount) external onlyValidator claimExists(_claimId) {
         require(claims[_claimId].status == ClaimStatus.PROCESSING, "Invalid status");
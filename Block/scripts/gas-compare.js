@@ -0,0 +1,77 @@
+import hardhat from "hardhat";
+const { ethers } = hardhat;
+
+// Gas used by the ways BlockchainAgent can anchor a new claim, measured on the
+// in-process Hardhat network: npx hardhat run scripts/gas-compare.js
+
+const CLAIM_TYPE_AUTO = 0;
+
+// Same shape as BlockchainAgent._summarize_agent_reports
+const agentReports = [
+  { agent: "document_agent", confidence: 0.9, findings_summary: { validity: "valid" } },
+  { agent: "damage_agent", confidence: 0.85, findings_summary: { estimated_cost: 650 } },
+  { agent: "fraud_agent", confidence: 0.8, findings_summary: { risk_score: 20, reason: "No significant risk factors" } },
+  { agent: "settlement_agent", confidence: 0.9, findings_summary: { recommended_amount: 600 } },
+].map((report) => JSON.stringify(report));
+
+function claimArgs(claimId, claimant) {
+  return [claimId, claimant, CLAIM_TYPE_AUTO, ethers.parseEther("700"), `ipfs://claim-${claimId}`];
+}
+
+function assessmentArgs() {
+  return [85, 20, ethers.parseEther("600"), agentReports, false];
+}
+
+// Any non-zero bytes32 costs the same to store; the agent commits the Merkle root of the full reports
+const reportsRoot = ethers.id(agentReports.join(""));
+
+function assessmentRootArgs() {
+  return [85, 20, ethers.parseEther("600"), reportsRoot, false];
+}
+
+async function gasUsed(txPromise) {
+  const receipt = await (await txPromise).wait();
+  return receipt.gasUsed;
+}
+
+async function main() {
+  const [deployer] = await ethers.getSigners();
+  const ClaimRegistry = await ethers.getContractFactory("ClaimRegistry");
+  const registry = await ClaimRegistry.deploy(deployer.address);
+  await registry.waitForDeployment();
+  await (await registry.addAuthorizedAgent(deployer.address)).wait();
+
+  const results = {};
+
+  // Two transactions: submitClaim, then updateAIAssessment
+  const submit = await gasUsed(registry.submitClaim(...claimArgs(1001, deployer.address)));
+  const update = await gasUsed(registry.updateAIAssessment(1001, ...assessmentArgs()));
+  results["submitClaim + updateAIAssessment"] = { transactions: 2, gasUsed: submit + update };
+
+  // One transaction: submitClaimWithAssessment
+  const combined = await gasUsed(
+    registry.submitClaimWithAssessment(...claimArgs(1002, deployer.address), ...assessmentArgs())
+  );
+  results["submitClaimWithAssessment"] = { transactions: 1, gasUsed: combined };
+
+  // Reports committed as a Merkle root instead of stored inline
+  const submitForRoot = await gasUsed(registry.submitClaim(...claimArgs(1003, deployer.address)));
+  const updateRoot = await gasUsed(registry.updateAIAssessmentRoot(1003, ...assessmentRootArgs()));
+  results["submitClaim + updateAIAssessmentRoot"] = { transactions: 2, gasUsed: submitForRoot + updateRoot };
+
+  const combinedRoot = await gasUsed(
+    registry.submitClaimWithAssessmentRoot(...claimArgs(1004, deployer.address), ...assessmentRootArgs())
+  );
+  results["submitClaimWithAssessmentRoot"] = { transactions: 1, gasUsed: combinedRoot };
+
+  const baseline = results["submitClaim + updateAIAssessment"].gasUsed;
+  for (const [path, { transactions, gasUsed }] of Object.entries(results)) {
+    const change = Number(((gasUsed - baseline) * 10000n) / baseline) / 100;
+    console.log(`${path.padEnd(40)} ${transactions} tx  ${gasUsed.toString().padStart(8)} gas  ${change >= 0 ? "+" : ""}${change}%`);
+  }
+}
+
+main().catch((error) => {
+  console.error("Gas comparison failed:", error);
+  process.exitCode = 1;
+});